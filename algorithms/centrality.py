@@ -0,0 +1,330 @@
+import heapq
+import math
+import multiprocessing
+import threading
+import time
+import numpy as np
+import networkx as nx
+from concurrent.futures import ProcessPoolExecutor
+from algorithms.graph_arrays import CompiledGraph, share_graph, attach_graph, strongly_connected_components
+
+def betweenness_error_bound(num_nodes, k, confidence=0.95):
+    """
+    Hoeffding bound on the error of k-source sampled betweenness
+
+    Each sampled source contributes a term in [0, n / (n - 1)] to the
+    normalized estimate, so with probability `confidence` every node's
+    estimate is within the returned value of its exact betweenness
+    (union bound over all nodes).
+    """
+    if k >= num_nodes:
+        return 0.0
+    value_range = num_nodes / max(num_nodes - 1, 1)
+    return value_range * math.sqrt(math.log(2 * num_nodes / (1 - confidence)) / (2 * k))
+
+def _brandes_search(indptr, heads, weights, km, source, num_nodes):
+    # Dijkstra from one source counting shortest paths (sigma) and their predecessors
+    dist = [float('inf')] * num_nodes
+    km_dist = [float('inf')] * num_nodes
+    sigma = [0] * num_nodes
+    preds = [[] for _ in range(num_nodes)]
+    settled = [False] * num_nodes
+    order = []
+    dist[source], km_dist[source], sigma[source] = 0.0, 0.0, 1
+    heap = [(0.0, source)]
+
+    while heap:
+        current_dist, node = heapq.heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = True
+        order.append(node)
+
+        for position in range(indptr[node], indptr[node + 1]):
+            head = heads[position]
+            new_dist = current_dist + weights[position]
+            if new_dist < dist[head]:
+                dist[head] = new_dist
+                km_dist[head] = km_dist[node] + km[position]
+                sigma[head] = sigma[node]
+                preds[head] = [node]
+                heapq.heappush(heap, (new_dist, head))
+            elif new_dist == dist[head] and not settled[head]:
+                sigma[head] += sigma[node]
+                preds[head].append(node)
+
+    # Dependencies in reverse settle order give this source's betweenness share
+    delta = [0.0] * num_nodes
+    for node in reversed(order):
+        coefficient = (1 + delta[node]) / sigma[node]
+        for pred in preds[node]:
+            delta[pred] += sigma[pred] * coefficient
+    delta[source] = 0.0
+    return dist, km_dist, delta
+
+def _accumulate_sources(graph, weights, sources, in_component):
+    # Partial sums for a block of sources; blocks combine with _merge_partials
+    num_nodes = graph.num_nodes
+    indptr, heads = graph._indptr_list, graph._heads_list
+    weights = np.asarray(weights, dtype=np.float64).tolist()
+    km = np.asarray(graph.edge_data['distance'], dtype=np.float64).tolist()
+
+    partial = {
+        'betweenness': np.zeros(num_nodes),
+        'incoming_cost': np.zeros(num_nodes),
+        'incoming_count': np.zeros(num_nodes),
+        'eccentricity': np.zeros(num_nodes),
+        'pair_cost': 0.0,
+        'pair_km': 0.0,
+        'pair_count': 0,
+        'diameter_cost': 0.0,
+        'diameter_km': 0.0
+    }
+
+    for source in sources:
+        dist, km_dist, delta = _brandes_search(indptr, heads, weights, km, source, num_nodes)
+        dist = np.array(dist)
+        reachable = np.isfinite(dist)
+        reachable[source] = False
+
+        partial['betweenness'] += delta
+        partial['incoming_cost'][reachable] += dist[reachable]
+        partial['incoming_count'][reachable] += 1
+        np.maximum(partial['eccentricity'], np.where(reachable, dist, 0.0), out=partial['eccentricity'])
+
+        if in_component[source]:
+            targets = reachable & in_component
+            km_dist = np.array(km_dist)
+            partial['pair_cost'] += dist[targets].sum()
+            partial['pair_km'] += km_dist[targets].sum()
+            partial['pair_count'] += int(targets.sum())
+            if targets.any():
+                partial['diameter_cost'] = max(partial['diameter_cost'], dist[targets].max())
+                partial['diameter_km'] = max(partial['diameter_km'], km_dist[targets].max())
+    return partial
+
+def _merge_partials(partials):
+    merged = partials[0]
+    for partial in partials[1:]:
+        for key in ('betweenness', 'incoming_cost', 'incoming_count', 'pair_cost', 'pair_km', 'pair_count'):
+            merged[key] = merged[key] + partial[key]
+        for key in ('eccentricity', 'diameter_cost', 'diameter_km'):
+            merged[key] = np.maximum(merged[key], partial[key])
+    return merged
+
+# Per-process state, attached once by the pool initializer
+_worker = {}
+
+def _init_worker(graph_descriptor):
+    blocks, graph, extras = attach_graph(graph_descriptor)
+    _worker.update(blocks=blocks, graph=graph, extras=extras)
+
+def _accumulate_shared(sources):
+    extras = _worker['extras']
+    return _accumulate_sources(_worker['graph'], extras['weights'], sources, extras['in_component'])
+
+def _accumulate_parallel(graph, weights, sources, in_component, n_workers, chunks_per_worker=4):
+    # Source blocks fan out over a process pool sharing the CSR arrays; partials are reduced here
+    blocks, descriptor = share_graph(graph, {'weights': np.asarray(weights, dtype=np.float64), 'in_component': in_component})
+    try:
+        chunks = [chunk for chunk in np.array_split(np.asarray(sources), n_workers * chunks_per_worker) if len(chunk)]
+        # Spawned, not forked: this runs from the service's background thread in a multithreaded server
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(descriptor,)) as pool:
+            partials = list(pool.map(_accumulate_shared, [chunk.tolist() for chunk in chunks]))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return _merge_partials(partials)
+
+def path_metrics(graph, weights, sources=None, component=None, n_workers=1):
+    """
+    Weighted centrality and path statistics from one set of one-to-all searches
+
+    Runs one Brandes-style Dijkstra per source over the CSR graph and
+    derives everything from it:
+    - betweenness: normalized as networkx's weighted betweenness
+    - closeness, eccentricity: from distances into each node (as networkx
+      does for directed graphs), in travel cost
+    - avg_path_cost/km, diameter_cost/km: over ordered pairs inside
+      `component` (node indices, default all nodes), with km measured
+      along the least-cost path
+
+    With `sources` (a sample of node indices) betweenness, closeness and
+    path averages are scaled-up estimates, and eccentricity and diameter
+    are lower bounds.
+
+    On a GraphView only the view's nodes and edges take part, and the
+    results cover its active nodes.
+
+    Parameters:
+    - graph: CompiledGraph or GraphView with 'distance' edge data (km)
+    - weights: Per-edge travel cost
+    - n_workers: Processes to partition sources across; workers map the
+      graph from shared memory and their partial sums are added up here
+    """
+    weights = graph.masked_weights(np.asarray(weights, dtype=np.float64))
+    active = graph.active_nodes
+    num_nodes = len(active)
+    sources = active.tolist() if sources is None else [int(node) for node in sources]
+    in_component = np.zeros(graph.num_nodes, dtype=bool)
+    in_component[active if component is None else np.asarray(list(component), dtype=np.intp)] = True
+
+    if n_workers > 1 and len(sources) > 1:
+        totals = _accumulate_parallel(graph, weights, sources, in_component, n_workers)
+    else:
+        totals = _accumulate_sources(graph, weights, sources, in_component)
+
+    # Sampled sources stand in for all of them
+    scale = num_nodes / len(sources) if sources else 0.0
+    betweenness = totals['betweenness']
+    if num_nodes > 2:
+        betweenness = betweenness * scale / ((num_nodes - 1) * (num_nodes - 2))
+    incoming_cost = totals['incoming_cost'] * scale
+    incoming_count = totals['incoming_count'] * scale
+
+    # Wasserman-Faust closeness, as networkx computes it
+    closeness = np.zeros(graph.num_nodes)
+    has_paths = incoming_cost > 0
+    if num_nodes > 1:
+        closeness[has_paths] = (incoming_count[has_paths] / incoming_cost[has_paths]) * (incoming_count[has_paths] / (num_nodes - 1))
+
+    pair_count = totals['pair_count']
+    edges = np.isfinite(weights)
+    degree = (np.bincount(graph.tails[edges], minlength=graph.num_nodes)
+              + np.bincount(graph.heads[edges], minlength=graph.num_nodes))
+    return {
+        'nodes': [graph.nodes[node] for node in active],
+        'degree': (degree[active] / max(num_nodes - 1, 1)).tolist(),
+        'betweenness': betweenness[active].tolist(),
+        'closeness': closeness[active].tolist(),
+        'eccentricity': totals['eccentricity'][active].tolist(),
+        'avg_path_cost': totals['pair_cost'] / pair_count if pair_count else 0.0,
+        'avg_path_km': totals['pair_km'] / pair_count if pair_count else 0.0,
+        'diameter_cost': float(totals['diameter_cost']),
+        'diameter_km': float(totals['diameter_km'])
+    }
+
+def compute_centrality(G, weight='weight', sample_threshold=2000, sample_size=500, seed=0, confidence=0.95,
+                       n_workers=1, parallel_threshold=1000):
+    """
+    Weighted centrality and path statistics for a NetworkX graph, CompiledGraph or GraphView
+
+    Graphs with more than `sample_threshold` nodes run searches from
+    `sample_size` random sources instead of all of them. Edges without
+    `weight` fall back to their distance. Graphs with more than
+    `parallel_threshold` nodes spread the searches over `n_workers`
+    processes; smaller ones are not worth the pool start-up.
+
+    Returns path_metrics' dict plus sample_size (None when exact),
+    error_bound (for betweenness), num_components, component_size (largest
+    strongly connected component) and seconds.
+    """
+    started = time.time()
+    graph = G if hasattr(G, 'masked_weights') else CompiledGraph.from_networkx(G, edge_attributes=('distance', weight, 'type'))
+    weights = graph.edge_data.get(weight, graph.edge_data['distance'])
+    active = graph.active_nodes
+
+    k = sample_size if len(active) > sample_threshold else None
+    sources = None
+    if k:
+        sources = np.random.default_rng(seed).choice(active, size=k, replace=False)
+    components = strongly_connected_components(graph)
+    largest_scc = max(components, key=len) if components else []
+
+    n_workers = n_workers if len(active) > parallel_threshold else 1
+    result = path_metrics(graph, weights, sources, largest_scc, n_workers)
+    result.update({
+        'sample_size': k,
+        'error_bound': betweenness_error_bound(len(active), k, confidence) if k else 0.0,
+        'num_components': len(components),
+        'component_size': len(largest_scc),
+        'seconds': time.time() - started
+    })
+    return result
+
+class CentralityService:
+    """
+    Centrality results cached per graph version, computed in the background
+
+    get() returns immediately: the result for the requested version if it
+    is ready, otherwise the most recent result for any version while a
+    worker thread computes the new one. Only one computation per version
+    ever runs.
+
+    Parameters:
+    - sample_threshold, sample_size, seed, confidence, n_workers: passed to compute_centrality
+    - max_versions: Number of versions kept in the cache
+    """
+
+    def __init__(self, sample_threshold=2000, sample_size=500, seed=0, confidence=0.95, n_workers=1, max_versions=4):
+        self.options = {
+            'sample_threshold': sample_threshold,
+            'sample_size': sample_size,
+            'seed': seed,
+            'confidence': confidence,
+            'n_workers': n_workers
+        }
+        self.max_versions = max_versions
+        self._results = {}
+        self._threads = {}
+        self._errors = {}
+        self._latest = None
+        self._lock = threading.Lock()
+
+    def _compute(self, version, G):
+        try:
+            result = compute_centrality(G, **self.options)
+        except Exception as error:
+            # Kept for the caller waiting on this version; the next get() starts a fresh attempt
+            with self._lock:
+                self._errors[version] = error
+            return
+        finally:
+            with self._lock:
+                self._threads.pop(version, None)
+        with self._lock:
+            self._results[version] = result
+            self._latest = result
+            while len(self._results) > self.max_versions:
+                del self._results[next(iter(self._results))]
+
+    def get(self, version, G, wait=False):
+        """
+        (result, is_current) for a graph version
+
+        Starts a background computation on a miss. Returns the last result
+        computed for any version (None if there is none yet) with
+        is_current False; pass wait=True to block until the version is ready.
+        If that computation fails, wait=True re-raises its exception and the
+        next call retries.
+        """
+        with self._lock:
+            if version in self._results:
+                return self._results[version], True
+            thread = self._threads.get(version)
+            if thread is None:
+                self._errors.pop(version, None)
+                # Work on a copy so later changes to a NetworkX graph cannot race the computation
+                graph = G.copy() if isinstance(G, nx.Graph) else G
+                thread = threading.Thread(target=self._compute, args=(version, graph), daemon=True)
+                self._threads[version] = thread
+                thread.start()
+            latest = self._latest
+
+        if wait:
+            thread.join()
+            with self._lock:
+                if version in self._results:
+                    return self._results[version], True
+                error = self._errors.pop(version, None)
+            if error is not None:
+                raise error
+            return self.get(version, G, wait=True)
+        return latest, False
+
+    def is_computing(self):
+        """True while any version is being computed"""
+        with self._lock:
+            return bool(self._threads)
@@ -0,0 +1,416 @@
+import heapq
+import numpy as np
+import networkx as nx
+from multiprocessing import shared_memory
+
+class CompiledGraph:
+    """
+    Directed road network in compressed sparse row (CSR) form
+
+    Edges are sorted by tail node, so the out-edges of node i are positions
+    indptr[i]:indptr[i + 1] of every edge array. Engines work on integer
+    node indices and edge positions; `nodes` and `node_index` map back to
+    the intersection IDs.
+
+    Attributes:
+    - nodes: Node IDs in index order
+    - indptr: (num_nodes + 1,) offsets into the edge arrays
+    - tails, heads: (num_edges,) endpoint indices of every edge
+    - edge_data: Dict of per-edge arrays ('distance', 'traffic', 'lanes', 'type', ...)
+    - node_data: Dict of per-node arrays ('type', 'division', 'elevation', 'pos', ...)
+    """
+
+    def __init__(self, nodes, tails, heads, edge_data=None, node_data=None):
+        self.nodes = list(nodes)
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        tails = np.asarray(tails, dtype=np.intp)
+        heads = np.asarray(heads, dtype=np.intp)
+
+        order = np.argsort(tails, kind='stable')
+        self.tails = tails[order]
+        self.heads = heads[order]
+        self.indptr = np.zeros(len(self.nodes) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self.tails, minlength=len(self.nodes)), out=self.indptr[1:])
+        self.edge_data = {key: np.asarray(values)[order] for key, values in (edge_data or {}).items()}
+        self.node_data = {key: np.asarray(values) for key, values in (node_data or {}).items()}
+
+        # Python lists for the inner loops of the search engines
+        self._indptr_list = self.indptr.tolist()
+        self._heads_list = self.heads.tolist()
+
+    @classmethod
+    def from_csr(cls, nodes, indptr, tails, heads, edge_data=None, node_data=None):
+        """Wrap arrays that are already in CSR order without copying them"""
+        graph = cls.__new__(cls)
+        graph.nodes = list(nodes)
+        graph.node_index = {node: i for i, node in enumerate(graph.nodes)}
+        graph.indptr, graph.tails, graph.heads = indptr, tails, heads
+        graph.edge_data = dict(edge_data or {})
+        graph.node_data = dict(node_data or {})
+        graph._indptr_list = indptr.tolist()
+        graph._heads_list = heads.tolist()
+        return graph
+
+    @classmethod
+    def from_data(cls, data):
+        """Compile the loaded dataset; every road becomes two directed edges, as in the app's graph"""
+        intersections = data['intersections']
+        roads = data['roads']
+        nodes = list(intersections)
+        node_index = {node: i for i, node in enumerate(nodes)}
+        forward = [node_index[road['from']] for road in roads]
+        backward = [node_index[road['to']] for road in roads]
+
+        edge_data = {
+            'distance': [road['distance'] for road in roads] * 2,
+            'traffic': [road.get('traffic', 0.0) for road in roads] * 2,
+            'lanes': [road.get('lanes', 2) for road in roads] * 2,
+            'type': [road.get('type', 'highway') for road in roads] * 2,
+            'road': list(range(len(roads))) * 2
+        }
+        node_data = {
+            'type': [intersections[node].get('type', 'city') for node in nodes],
+            'division': [intersections[node].get('division', 'Garhwal') for node in nodes],
+            'elevation': [intersections[node].get('elevation', 1000) for node in nodes],
+            'pos': [intersections[node]['pos'] for node in nodes]
+        }
+        return cls(nodes, forward + backward, backward + forward, edge_data, node_data)
+
+    @classmethod
+    def from_networkx(cls, G, edge_attributes=('weight', 'distance', 'traffic', 'lanes', 'type'),
+                      node_attributes=('type', 'division', 'elevation', 'pos')):
+        """Compile a NetworkX DiGraph, keeping the listed attributes where every edge/node has them"""
+        nodes = list(G.nodes())
+        node_index = {node: i for i, node in enumerate(nodes)}
+        edges = list(G.edges(data=True))
+        edge_data = {
+            key: [attrs[key] for _, _, attrs in edges]
+            for key in edge_attributes if all(key in attrs for _, _, attrs in edges)
+        }
+        node_data = {
+            key: [G.nodes[node][key] for node in nodes]
+            for key in node_attributes if all(key in G.nodes[node] for node in nodes)
+        }
+        return cls(
+            nodes,
+            [node_index[u] for u, _, _ in edges],
+            [node_index[v] for _, v, _ in edges],
+            edge_data,
+            node_data
+        )
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def num_edges(self):
+        return len(self.heads)
+
+    def out_edges(self, node):
+        """Edge positions leaving a node index"""
+        return range(self._indptr_list[node], self._indptr_list[node + 1])
+
+    def edge_position(self, u, v):
+        """Edge position of u -> v (node IDs), or None"""
+        tail, head = self.node_index[u], self.node_index[v]
+        for position in self.out_edges(tail):
+            if self._heads_list[position] == head:
+                return position
+        return None
+
+    @property
+    def active_nodes(self):
+        """Indices of the nodes visible to engines (all of them for a full graph)"""
+        return np.arange(self.num_nodes)
+
+    @property
+    def edge_active(self):
+        """Boolean mask of usable edges, or None when every edge is usable"""
+        return None
+
+    def masked_weights(self, weights):
+        """Edge weights as engines should see them; a full graph uses them unchanged"""
+        return weights
+
+    def path_nodes(self, source, target, pred_edge):
+        """Node IDs along a shortest path tree from source to target ([] if unreachable)"""
+        node = self.node_index[target]
+        source = self.node_index[source]
+        path = [node]
+        while node != source:
+            edge = pred_edge[node]
+            if edge < 0:
+                return []
+            node = self.tails[edge]
+            path.append(node)
+        return [self.nodes[i] for i in reversed(path)]
+
+def _filter_masks(node_data, edge_types, tails, heads, divisions=None, road_types=None,
+                  min_elevation=None, max_elevation=None):
+    # Node and edge masks for the shared filter options; edges need both endpoints kept
+    node_mask = np.ones(len(node_data['division']), dtype=bool)
+    if divisions is not None:
+        node_mask &= np.isin(node_data['division'], list(divisions))
+    if min_elevation is not None:
+        node_mask &= np.asarray(node_data['elevation']) >= min_elevation
+    if max_elevation is not None:
+        node_mask &= np.asarray(node_data['elevation']) <= max_elevation
+    edge_mask = node_mask[tails] & node_mask[heads]
+    if road_types is not None:
+        edge_mask &= np.isin(edge_types, list(road_types))
+    return node_mask, edge_mask
+
+class GraphView:
+    """
+    Filtered view of a CompiledGraph that shares all of its arrays
+
+    Masked-out edges get infinite weight when an engine asks for
+    masked_weights(), so traversals never cross them, and metrics only
+    report the view's active nodes. Nothing in the base graph is copied;
+    a view costs one boolean per node and per edge.
+
+    Parameters:
+    - graph: Base CompiledGraph
+    - node_mask: Boolean per node (default: all)
+    - edge_mask: Boolean per edge (default: all); edges touching a masked
+      node are always excluded
+    """
+
+    def __init__(self, graph, node_mask=None, edge_mask=None):
+        self.graph = graph
+        self.node_mask = np.ones(graph.num_nodes, dtype=bool) if node_mask is None else np.asarray(node_mask, dtype=bool)
+        edge_mask = np.ones(graph.num_edges, dtype=bool) if edge_mask is None else np.asarray(edge_mask, dtype=bool)
+        self._edge_active = edge_mask & self.node_mask[graph.tails] & self.node_mask[graph.heads]
+
+    @classmethod
+    def from_filters(cls, graph, divisions=None, road_types=None, min_elevation=None, max_elevation=None):
+        """View keeping nodes in `divisions` and the elevation band, and edges of `road_types`"""
+        node_mask, edge_mask = _filter_masks(
+            graph.node_data, graph.edge_data['type'], graph.tails, graph.heads,
+            divisions, road_types, min_elevation, max_elevation
+        )
+        return cls(graph, node_mask, edge_mask)
+
+    def __getattr__(self, name):
+        # Arrays and helpers not overridden here come straight from the base graph
+        return getattr(self.graph, name)
+
+    @property
+    def active_nodes(self):
+        return np.flatnonzero(self.node_mask)
+
+    @property
+    def edge_active(self):
+        return self._edge_active
+
+    def masked_weights(self, weights):
+        return np.where(self._edge_active, weights, np.inf)
+
+def filter_networkx(G, divisions=None, road_types=None, min_elevation=None, max_elevation=None):
+    """
+    The same filters as GraphView.from_filters as a zero-copy NetworkX view
+
+    For the NetworkX-based routing engines (Dijkstra, A*, Bellman-Ford,
+    reliability routing), which only use G.neighbors and G[u][v].
+    """
+    def keep_node(node):
+        data = G.nodes[node]
+        return ((divisions is None or data.get('division') in divisions)
+                and (min_elevation is None or data.get('elevation', 1000) >= min_elevation)
+                and (max_elevation is None or data.get('elevation', 1000) <= max_elevation))
+
+    def keep_edge(u, v):
+        return road_types is None or G[u][v].get('type') in road_types
+
+    return nx.subgraph_view(G, filter_node=keep_node, filter_edge=keep_edge)
+
+def strongly_connected_components(graph):
+    """
+    Strongly connected components of a graph or view (iterative Tarjan)
+
+    Returns a list of node index lists, covering the active nodes only.
+    """
+    indptr, heads = graph._indptr_list, graph._heads_list
+    edge_active = graph.edge_active
+    edge_active = None if edge_active is None else edge_active.tolist()
+    num_nodes = graph.num_nodes
+    index, low = [-1] * num_nodes, [0] * num_nodes
+    on_stack = [False] * num_nodes
+    stack, components, counter = [], [], 0
+
+    for root in graph.active_nodes.tolist():
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, indptr[root])]
+
+        while work:
+            node, position = work[-1]
+            descended = False
+            while position < indptr[node + 1]:
+                edge, position = position, position + 1
+                if edge_active is not None and not edge_active[edge]:
+                    continue
+                head = heads[edge]
+                if index[head] == -1:
+                    work[-1] = (node, position)
+                    index[head] = low[head] = counter
+                    counter += 1
+                    stack.append(head)
+                    on_stack[head] = True
+                    work.append((head, indptr[head]))
+                    descended = True
+                    break
+                if on_stack[head]:
+                    low[node] = min(low[node], index[head])
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+def share_arrays(arrays):
+    """
+    Copy numeric arrays into shared memory blocks
+
+    Returns (blocks, descriptor). Keep `blocks` alive (and close/unlink them
+    when done); pass the small picklable `descriptor` to other processes,
+    which map the same memory with attach_arrays.
+    """
+    blocks, descriptor = [], {}
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        descriptor[key] = (block.name, array.shape, array.dtype.str)
+    return blocks, descriptor
+
+def attach_arrays(descriptor):
+    """Map arrays shared with share_arrays; returns (blocks, arrays) with read-only views"""
+    blocks, arrays = [], {}
+    for key, (name, shape, dtype) in descriptor.items():
+        block = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        blocks.append(block)
+        arrays[key] = array
+    return blocks, arrays
+
+def share_graph(graph, extra_arrays=None):
+    """
+    Place a CompiledGraph's (or GraphView's) numeric arrays plus any extras in shared memory
+
+    String-valued edge or node data is left out; compile it to numbers
+    first (e.g. capacities) and pass it in `extra_arrays`. Returns
+    (blocks, descriptor) as share_arrays, with the node IDs in the descriptor.
+    """
+    arrays = {'indptr': graph.indptr, 'tails': graph.tails, 'heads': graph.heads}
+    arrays.update({f'edge:{key}': values for key, values in graph.edge_data.items() if values.dtype.kind in 'biuf'})
+    arrays.update({f'node:{key}': values for key, values in graph.node_data.items() if values.dtype.kind in 'biuf'})
+    arrays.update({f'extra:{key}': values for key, values in (extra_arrays or {}).items()})
+    if graph.edge_active is not None:
+        # Views travel as their masks and are rebuilt over the shared base arrays
+        arrays.update({'view:node_mask': graph.node_mask, 'view:edge_mask': graph.edge_active})
+    blocks, descriptor = share_arrays(arrays)
+    return blocks, {'nodes': list(graph.nodes), 'arrays': descriptor}
+
+def attach_graph(descriptor):
+    """
+    Rebuild a CompiledGraph over shared memory from share_graph's descriptor
+
+    Returns (blocks, graph, extras); no array data is copied.
+    """
+    blocks, arrays = attach_arrays(descriptor['arrays'])
+    edge_data = {key[5:]: values for key, values in arrays.items() if key.startswith('edge:')}
+    node_data = {key[5:]: values for key, values in arrays.items() if key.startswith('node:')}
+    extras = {key[6:]: values for key, values in arrays.items() if key.startswith('extra:')}
+    graph = CompiledGraph.from_csr(descriptor['nodes'], arrays['indptr'], arrays['tails'], arrays['heads'],
+                                   edge_data, node_data)
+    if 'view:node_mask' in arrays:
+        graph = GraphView(graph, arrays['view:node_mask'], arrays['view:edge_mask'])
+    return blocks, graph, extras
+
+def shortest_path_tree(graph, source, weights):
+    """
+    Dijkstra from one node index over CSR edge weights
+
+    Returns (dist, pred_edge, order): distances (inf if unreachable), the
+    edge position reaching each node (-1 for the source and unreachable
+    nodes), and the nodes in the order they were settled.
+    """
+    indptr = graph._indptr_list
+    heads = graph._heads_list
+    weights = graph.masked_weights(weights)
+    weights = weights.tolist() if isinstance(weights, np.ndarray) else list(weights)
+
+    dist = [float('inf')] * graph.num_nodes
+    pred_edge = [-1] * graph.num_nodes
+    settled = [False] * graph.num_nodes
+    order = []
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+
+    while heap:
+        current_dist, node = heapq.heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = True
+        order.append(node)
+
+        for position in range(indptr[node], indptr[node + 1]):
+            head = heads[position]
+            new_dist = current_dist + weights[position]
+            if new_dist < dist[head]:
+                dist[head] = new_dist
+                pred_edge[head] = position
+                heapq.heappush(heap, (new_dist, head))
+
+    return np.array(dist), np.array(pred_edge, dtype=np.intp), np.array(order, dtype=np.intp)
+
+def tree_depths(graph, pred_edge, order):
+    """Hop depth of every settled node in a shortest path tree (-1 if unreachable)"""
+    depth = np.full(graph.num_nodes, -1, dtype=np.intp)
+    tails = graph.tails
+    depth_list = depth.tolist()
+    pred_list = pred_edge.tolist()
+    for node in order.tolist():
+        edge = pred_list[node]
+        depth_list[node] = 0 if edge < 0 else depth_list[tails[edge]] + 1
+    return np.array(depth_list, dtype=np.intp)
+
+def accumulate_tree_loads(graph, pred_edge, depth, node_loads):
+    """
+    Push per-node loads back to the root of a shortest path tree
+
+    Processes one depth level at a time, deepest first: every node at a
+    level hands its load to the edge that reaches it and to that edge's
+    tail, all in one vectorized step. Returns per-edge flows.
+    """
+    edge_flows = np.zeros(graph.num_edges)
+    loads = np.asarray(node_loads, dtype=np.float64).copy()
+    by_depth = np.argsort(depth, kind='stable')
+    levels = np.searchsorted(depth[by_depth], np.arange(depth.max() + 2))
+
+    for level in range(depth.max(), 0, -1):
+        nodes = by_depth[levels[level]:levels[level + 1]]
+        edges = pred_edge[nodes]
+        edge_flows[edges] += loads[nodes]
+        np.add.at(loads, graph.tails[edges], loads[nodes])
+    return edge_flows
@@ -0,0 +1,253 @@
+import heapq
+import threading
+import numpy as np
+from algorithms.graph_arrays import CompiledGraph
+
+class DivisionRouter:
+    """
+    Exact shortest paths over a network partitioned into divisions
+
+    Each division is a cell. Nodes with a road to another division are its
+    boundary nodes, and for every cell the shortest in-cell distances
+    between its boundary nodes are precomputed. A query searches locally
+    from the source inside its division, crosses an overlay made of the
+    boundary tables and the roads between divisions, and finishes with a
+    local search into the target's division. Paths that leave a division
+    and come back are covered by the overlay, so results match a plain
+    Dijkstra on the whole network.
+
+    When weights change only the cells whose internal roads changed are
+    recomputed; roads between divisions are read straight from the weights.
+    Queries and updates hold a lock, so one router can be shared between
+    sessions.
+
+    Boundary nodes are only the endpoints of roads between divisions, but
+    the tables prune the search only when those are few. In the bundled
+    dataset 202 of 428 roads cross between Garhwal and Kumaon, so 176 of
+    200 intersections are boundary nodes and a query is slower than a plain
+    Dijkstra (about 2 ms against 0.3 ms). The router pays off on networks
+    whose divisions meet at a handful of border crossings; boundary_share
+    reports how close a network is to that.
+
+    Parameters:
+    - graph: CompiledGraph with 'division' node data (e.g. CompiledGraph.from_networkx)
+    - weights: Per-edge travel cost
+    """
+
+    def __init__(self, graph, weights):
+        self.graph = graph
+        self._lock = threading.Lock()
+        self.weights = np.asarray(weights, dtype=np.float64).copy()
+        divisions = graph.node_data['division']
+        self.cell_names = sorted(set(divisions))
+        cell_of = {name: i for i, name in enumerate(self.cell_names)}
+        self.cell = np.array([cell_of[division] for division in divisions], dtype=np.intp)
+
+        # Roads inside one division versus roads linking two
+        self.internal = self.cell[graph.tails] == self.cell[graph.heads]
+        crossing = np.flatnonzero(~self.internal)
+        self.is_boundary = np.zeros(graph.num_nodes, dtype=bool)
+        self.is_boundary[graph.tails[crossing]] = True
+        self.is_boundary[graph.heads[crossing]] = True
+        self.boundary = [
+            np.flatnonzero(self.is_boundary & (self.cell == c)).tolist()
+            for c in range(len(self.cell_names))
+        ]
+        self._cell_of = self.cell.tolist()
+        self._internal = self.internal.tolist()
+        self._tails = graph.tails.tolist()
+        self._weights = self.weights.tolist()
+        self._crossing_out = [[] for _ in range(graph.num_nodes)]
+        for position in crossing.tolist():
+            self._crossing_out[self._tails[position]].append(position)
+
+        # Incoming edges per node for the backward search from a target
+        incoming = np.argsort(graph.heads, kind='stable')
+        indptr = np.zeros(graph.num_nodes + 1, dtype=np.intp)
+        np.cumsum(np.bincount(graph.heads, minlength=graph.num_nodes), out=indptr[1:])
+        self._reverse = (indptr.tolist(), graph.tails[incoming].tolist(), incoming.tolist())
+
+        # Per cell: {boundary node: (dist, pred_edge)} for in-cell searches from it
+        self.tables = [None] * len(self.cell_names)
+        for c in range(len(self.cell_names)):
+            self._build_cell(c)
+
+    @property
+    def boundary_share(self):
+        """Fraction of nodes that are boundary nodes; queries only get faster than Dijkstra when it is small"""
+        return float(self.is_boundary.mean()) if self.graph.num_nodes else 0.0
+
+    @classmethod
+    def from_networkx(cls, G, weight='weight'):
+        """Router for a NetworkX DiGraph whose nodes carry a 'division' attribute"""
+        graph = CompiledGraph.from_networkx(G, edge_attributes=(weight,), node_attributes=('division',))
+        return cls(graph, graph.edge_data[weight])
+
+    def _local_search(self, sources, reverse=False):
+        # Dijkstra that never leaves the sources' division; sources is {node: starting distance}
+        graph = self.graph
+        weights = self._weights
+        if reverse:
+            indptr, neighbours, positions = self._reverse
+        else:
+            indptr, neighbours, positions = graph._indptr_list, graph._heads_list, None
+        internal = self._internal
+
+        dist = dict(sources)
+        pred_edge = {}
+        heap = [(distance, node) for node, distance in sources.items()]
+        heapq.heapify(heap)
+        settled = set()
+        while heap:
+            current_dist, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+            for i in range(indptr[node], indptr[node + 1]):
+                position = positions[i] if reverse else i
+                if not internal[position]:
+                    continue
+                neighbour = neighbours[i]
+                new_dist = current_dist + weights[position]
+                if new_dist < dist.get(neighbour, float('inf')):
+                    dist[neighbour] = new_dist
+                    pred_edge[neighbour] = position
+                    heapq.heappush(heap, (new_dist, neighbour))
+        return dist, pred_edge
+
+    def _build_cell(self, c):
+        self.tables[c] = {node: self._local_search({node: 0.0}) for node in self.boundary[c]}
+
+    def update_weights(self, weights):
+        """
+        Replace the edge weights, recomputing only divisions whose internal roads changed
+
+        Returns the names of the recomputed divisions.
+        """
+        with self._lock:
+            return self._apply_weights(weights)
+
+    def _apply_weights(self, weights):
+        # Caller holds the lock
+        weights = np.asarray(weights, dtype=np.float64)
+        changed = np.flatnonzero((weights != self.weights) & self.internal)
+        self.weights = weights.copy()
+        self._weights = self.weights.tolist()
+        cells = np.unique(self.cell[self.graph.tails[changed]]).tolist()
+        for c in cells:
+            self._build_cell(c)
+        return [self.cell_names[c] for c in cells]
+
+    def weights_from_networkx(self, G, weight='weight'):
+        """Edge weights in router order from the NetworkX graph the router was built from"""
+        nodes = self.graph.nodes
+        return [G[nodes[u]][nodes[v]][weight] for u, v in zip(self._tails, self.graph._heads_list)]
+
+    def update_from_networkx(self, G, weight='weight'):
+        """update_weights with the current edge weights of the NetworkX graph the router was built from"""
+        return self.update_weights(self.weights_from_networkx(G, weight))
+
+    def _overlay_search(self, seeds, targets, bound):
+        # Dijkstra over boundary nodes: in-cell table hops plus roads between divisions
+        weights = self._weights
+        dist = dict(seeds)
+        via = {}
+        heap = [(distance, node) for node, distance in seeds.items()]
+        heapq.heapify(heap)
+        settled = set()
+        best, best_node = bound, None
+        while heap:
+            current_dist, node = heapq.heappop(heap)
+            if current_dist >= best:
+                break
+            if node in settled:
+                continue
+            settled.add(node)
+            if node in targets and current_dist + targets[node] < best:
+                best, best_node = current_dist + targets[node], node
+
+            table_dist = self.tables[self._cell_of[node]][node][0]
+            hops = [(other, table_dist[other], ('table', node)) for other in self.boundary[self._cell_of[node]]
+                    if other != node and other in table_dist]
+            hops += [(self.graph._heads_list[position], weights[position], ('edge', position))
+                     for position in self._crossing_out[node]]
+            for neighbour, cost, step in hops:
+                new_dist = current_dist + cost
+                if new_dist < dist.get(neighbour, float('inf')):
+                    dist[neighbour] = new_dist
+                    via[neighbour] = step
+                    heapq.heappush(heap, (new_dist, neighbour))
+        return best, best_node, via
+
+    def _unpack_edges(self, pred_edge, start, end, reverse=False):
+        # Edge positions along a local search tree between its root and `end`
+        edges = []
+        node = end
+        while node != start:
+            position = pred_edge[node]
+            edges.append(position)
+            node = self.graph._heads_list[position] if reverse else self._tails[position]
+        return edges if reverse else edges[::-1]
+
+    def route_indices(self, source, target):
+        """(cost, edge positions) between two node indices; (inf, []) if unreachable"""
+        if source == target:
+            return 0.0, []
+        forward_dist, forward_pred = self._local_search({source: 0.0})
+        backward_dist, backward_pred = self._local_search({target: 0.0}, reverse=True)
+
+        # A path that never leaves the shared division
+        best = forward_dist.get(target, float('inf'))
+        seeds = {node: distance for node, distance in forward_dist.items() if self.is_boundary[node]}
+        targets = {node: distance for node, distance in backward_dist.items() if self.is_boundary[node]}
+        overlay_best, exit_node, via = self._overlay_search(seeds, targets, best)
+        if exit_node is None:
+            if best == float('inf'):
+                return best, []
+            return best, self._unpack_edges(forward_pred, source, target)
+
+        # Walk the overlay back to the boundary node first reached from the source
+        middle = []
+        node = exit_node
+        while node in via:
+            kind, value = via[node]
+            if kind == 'edge':
+                middle.append([value])
+                node = self._tails[value]
+            else:
+                middle.append(self._unpack_edges(self.tables[self._cell_of[value]][value][1], value, node))
+                node = value
+        entry_node = node
+
+        edges = self._unpack_edges(forward_pred, source, entry_node)
+        for segment in reversed(middle):
+            edges.extend(segment)
+        edges.extend(self._unpack_edges(backward_pred, target, exit_node, reverse=True))
+        return overlay_best, edges
+
+    def route(self, source, target):
+        """(cost, path of node IDs) between two node IDs, like dijkstra_algorithm; (inf, []) if unreachable"""
+        with self._lock:
+            return self._route(source, target)
+
+    def route_with_weights(self, source, target, weights):
+        """
+        route() on the given edge weights, applied under the same lock
+
+        Another thread cannot swap in its own weights between the update and
+        the query. Only divisions whose internal weights changed are rebuilt.
+        """
+        with self._lock:
+            self._apply_weights(weights)
+            return self._route(source, target)
+
+    def _route(self, source, target):
+        # Caller holds the lock
+        graph = self.graph
+        if source not in graph.node_index or target not in graph.node_index:
+            return float('inf'), []
+        cost, edges = self.route_indices(graph.node_index[source], graph.node_index[target])
+        if cost == float('inf'):
+            return cost, []
+        path = [source] + [graph.nodes[graph._heads_list[position]] for position in edges]
+        return cost, path
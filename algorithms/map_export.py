@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_DATA_PATH = os.path.join(DATA_DIR, 'uttarakhand_realistic_data.json')
+DEFAULT_EXPORT_DIR = os.path.join(DATA_DIR, 'map_export')
+
+# Upper bounds of the low and moderate traffic classes; anything above is heavy
+TRAFFIC_CLASS_BOUNDS = [0.3, 0.6]
+TRAFFIC_CLASS_NAMES = ['low', 'moderate', 'heavy']
+
+# (lowest zoom, road types included or None for all, coordinate decimals); minor roads appear as you zoom in
+DETAIL_LEVELS = [
+    (0, ('highway',), 3),
+    (8, ('highway', 'mountain', 'hill'), 4),
+    (10, None, 5)
+]
+
+def traffic_classes(traffic):
+    """Traffic class code per road: 0 low, 1 moderate, 2 heavy"""
+    return np.digitize(np.asarray(traffic, dtype=np.float64), TRAFFIC_CLASS_BOUNDS).astype(np.int8)
+
+def _road_groups(data):
+    # One exported road per unordered pair of intersections; roads maps each data road to it
+    roads = data['roads']
+    pairs = [tuple(sorted((road['from'], road['to']))) for road in roads]
+    index = {}
+    groups = [index.setdefault(pair, len(index)) for pair in pairs]
+    first = [None] * len(index)
+    for i, group in enumerate(groups):
+        if first[group] is None:
+            first[group] = i
+    version = hashlib.sha1(json.dumps(list(index)).encode()).hexdigest()[:12]
+    return np.array(groups, dtype=np.intp), first, version
+
+def _feature_classes(data, groups, num_features):
+    # Busiest class among the data roads merged into each exported road
+    classes = np.zeros(num_features, dtype=np.int8)
+    np.maximum.at(classes, groups, traffic_classes([road['traffic'] for road in data['roads']]))
+    return classes
+
+def _write_json(path, payload):
+    # Compact JSON, swapped in atomically so a reader never sees a partial file
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+def export_network(data, output_dir=DEFAULT_EXPORT_DIR):
+    """
+    Write the network as static GeoJSON files for a front end to load directly
+
+    Files written to `output_dir`:
+    - nodes.geojson: intersections with name, type, elevation and division
+    - roads_z<zoom>.geojson: one file per DETAIL_LEVELS entry, used from
+      that zoom up; both directions of a road are one feature whose `id`
+      indexes the traffic arrays, with name, type, lanes and traffic class
+    - traffic.json: traffic class of every exported road plus a tick counter
+    - manifest.json: file names, detail levels, class names, bounds and a
+      network version
+
+    Traffic refreshes afterwards go through write_traffic_delta. Returns the manifest.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    intersections, roads = data['intersections'], data['roads']
+    groups, first, version = _road_groups(data)
+    classes = _feature_classes(data, groups, len(first))
+
+    node_features = [
+        {
+            'type': 'Feature',
+            'id': node_id,
+            'geometry': {'type': 'Point', 'coordinates': [round(node['pos'][1], 5), round(node['pos'][0], 5)]},
+            'properties': {
+                'name': node['name'],
+                'type': node.get('type', 'city'),
+                'elevation': node.get('elevation', 1000),
+                'division': node.get('division', 'Garhwal')
+            }
+        }
+        for node_id, node in intersections.items()
+    ]
+    _write_json(os.path.join(output_dir, 'nodes.geojson'), {'type': 'FeatureCollection', 'features': node_features})
+
+    levels = []
+    for min_zoom, road_types, decimals in DETAIL_LEVELS:
+        features = []
+        for feature_id, i in enumerate(first):
+            road = roads[i]
+            if road_types is not None and road.get('type', 'highway') not in road_types:
+                continue
+            start, end = intersections[road['from']]['pos'], intersections[road['to']]['pos']
+            features.append({
+                'type': 'Feature',
+                'id': feature_id,
+                'geometry': {
+                    'type': 'LineString',
+                    'coordinates': [
+                        [round(start[1], decimals), round(start[0], decimals)],
+                        [round(end[1], decimals), round(end[0], decimals)]
+                    ]
+                },
+                'properties': {
+                    'name': road['name'],
+                    'type': road.get('type', 'highway'),
+                    'lanes': road.get('lanes', 2),
+                    'traffic_class': int(classes[feature_id])
+                }
+            })
+        file_name = f'roads_z{min_zoom}.geojson'
+        _write_json(os.path.join(output_dir, file_name), {'type': 'FeatureCollection', 'features': features})
+        levels.append({'min_zoom': min_zoom, 'file': file_name, 'roads': len(features)})
+
+    _write_json(os.path.join(output_dir, 'traffic.json'), {
+        'version': version,
+        'tick': 0,
+        'classes': classes.tolist()
+    })
+
+    positions = np.array([node['pos'] for node in intersections.values()], dtype=np.float64)
+    manifest = {
+        'version': version,
+        'nodes': 'nodes.geojson',
+        'levels': levels,
+        'traffic': 'traffic.json',
+        'traffic_delta': 'traffic_delta.json',
+        'traffic_classes': TRAFFIC_CLASS_NAMES,
+        'bounds': [
+            float(positions[:, 1].min()), float(positions[:, 0].min()),
+            float(positions[:, 1].max()), float(positions[:, 0].max())
+        ]
+    }
+    _write_json(os.path.join(output_dir, 'manifest.json'), manifest)
+    return manifest
+
+def write_traffic_delta(data, output_dir=DEFAULT_EXPORT_DIR, min_interval=0, stale_lock_seconds=60):
+    """
+    Refresh an export's traffic: write only the roads whose class changed
+
+    traffic_delta.json holds the changed road ids and their new classes,
+    with `base_tick` (the tick it applies on top of) and `tick`. A front end
+    at base_tick applies the delta; one that fell further behind reloads
+    traffic.json, which is rewritten with the full class list.
+
+    The read-modify-write runs under an exclusively created lock file, so
+    concurrent writers (other sessions or processes) never publish two
+    deltas for the same tick. A lock older than `stale_lock_seconds` is
+    treated as left behind by a crashed writer and removed.
+
+    Returns the number of roads whose class changed, or None when skipped
+    because another writer holds the lock or the snapshot is younger than
+    `min_interval` seconds. Raises ValueError if the export was written for
+    a different road network.
+    """
+    lock_path = os.path.join(output_dir, 'traffic.lock')
+    try:
+        lock = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(lock_path) > stale_lock_seconds:
+                os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+        return None
+
+    try:
+        traffic_path = os.path.join(output_dir, 'traffic.json')
+        if time.time() - os.path.getmtime(traffic_path) < min_interval:
+            return None
+        with open(traffic_path, 'r') as f:
+            previous = json.load(f)
+        groups, first, version = _road_groups(data)
+        if previous['version'] != version:
+            raise ValueError("Map export was written for a different road network")
+
+        classes = _feature_classes(data, groups, len(first))
+        changed = np.flatnonzero(classes != np.asarray(previous['classes'], dtype=np.int8))
+        tick = previous['tick'] + 1
+        _write_json(os.path.join(output_dir, 'traffic_delta.json'), {
+            'version': version,
+            'base_tick': previous['tick'],
+            'tick': tick,
+            'ids': changed.tolist(),
+            'classes': classes[changed].tolist()
+        })
+        _write_json(traffic_path, {'version': version, 'tick': tick, 'classes': classes.tolist()})
+        return len(changed)
+    finally:
+        os.close(lock)
+        os.remove(lock_path)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the road network as static GeoJSON files per zoom level')
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help='Network data JSON file')
+    parser.add_argument('--output', default=DEFAULT_EXPORT_DIR, help='Directory for the exported files')
+    args = parser.parse_args()
+
+    with open(args.data, 'r') as f:
+        network_data = json.load(f)
+    started = time.time()
+    export_manifest = export_network(network_data, args.output)
+    road_counts = ', '.join(f"z{level['min_zoom']}: {level['roads']}" for level in export_manifest['levels'])
+    print(f"Exported {len(network_data['intersections'])} intersections and roads ({road_counts}) "
+          f"to {args.output} in {time.time() - started:.2f}s")
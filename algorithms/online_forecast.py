@@ -0,0 +1,125 @@
+import numpy as np
+from datetime import datetime, timedelta
+
+HOURS_PER_WEEK = 168
+
+def hour_of_week(when):
+    """Hour-of-week slot (0 = Monday 00:00, 167 = Sunday 23:00)"""
+    return when.weekday() * 24 + when.hour
+
+class OnlineTrafficModel:
+    """
+    Per-road traffic forecaster learned online from observed snapshots
+
+    Additive seasonal exponential smoothing: each road keeps a smoothed level
+    plus one offset per hour-of-week slot, all in compact float32 arrays.
+    Every observation updates one level and one seasonal slot in O(1), so a
+    full network snapshot is a single vectorized update.
+
+    Parameters:
+    - num_roads: Number of roads (rows in every snapshot)
+    - alpha: Level smoothing factor; keep it small relative to the update
+      rate so the level tracks the weekly mean rather than the current hour
+    - gamma: Seasonal smoothing factor
+    - beta: Smoothing factor for the squared one-step error (forecast spread)
+    - initial_level: Starting traffic level for every road
+    - initial_seasonal: Optional (num_roads, 168) or (168,) seasonal offsets
+    """
+
+    def __init__(self, num_roads, alpha=0.01, gamma=0.2, beta=0.05, initial_level=0.4, initial_seasonal=None):
+        self.alpha = alpha
+        self.gamma = gamma
+        self.beta = beta
+        self.level = np.full(num_roads, initial_level, dtype=np.float32)
+        self.seasonal = np.zeros((num_roads, HOURS_PER_WEEK), dtype=np.float32)
+        if initial_seasonal is not None:
+            self.seasonal[:] = initial_seasonal
+        self.error_var = np.full(num_roads, 0.01, dtype=np.float32)
+        self.observations = np.zeros(num_roads, dtype=np.int64)
+        self.last_update = None
+
+    @property
+    def num_roads(self):
+        return len(self.level)
+
+    def update(self, road, value, when=None):
+        """Add one observation for a single road in O(1)"""
+        when = when or datetime.now()
+        slot = hour_of_week(when)
+
+        error = value - (self.level[road] + self.seasonal[road, slot])
+        new_level = self.alpha * (value - self.seasonal[road, slot]) + (1 - self.alpha) * self.level[road]
+        self.seasonal[road, slot] = self.gamma * (value - new_level) + (1 - self.gamma) * self.seasonal[road, slot]
+        self.level[road] = new_level
+        self.error_var[road] = self.beta * error * error + (1 - self.beta) * self.error_var[road]
+        self.observations[road] += 1
+        self.last_update = when
+
+    def update_snapshot(self, values, when=None):
+        """
+        Add a full network snapshot in one vectorized step
+
+        NaN entries (roads without a reading this tick) are skipped.
+        """
+        when = when or datetime.now()
+        slot = hour_of_week(when)
+        values = np.asarray(values, dtype=np.float32)
+        observed = ~np.isnan(values)
+
+        seasonal = self.seasonal[:, slot]
+        error = values - (self.level + seasonal)
+        new_level = self.alpha * (values - seasonal) + (1 - self.alpha) * self.level
+        new_seasonal = self.gamma * (values - new_level) + (1 - self.gamma) * seasonal
+        new_error_var = self.beta * error * error + (1 - self.beta) * self.error_var
+
+        self.level = np.where(observed, new_level, self.level).astype(np.float32)
+        self.seasonal[:, slot] = np.where(observed, new_seasonal, seasonal)
+        self.error_var = np.where(observed, new_error_var, self.error_var).astype(np.float32)
+        self.observations += observed
+        self.last_update = when
+
+    def forecast(self, horizon_hours=48, start_time=None, roads=None):
+        """
+        Forecast traffic for the next `horizon_hours` hours
+
+        Returns (times, matrix) with a float32 matrix of shape
+        (num_roads, horizon_hours), or only the rows in `roads` if given.
+        """
+        start_time = start_time or datetime.now()
+        times = [start_time + timedelta(hours=hour) for hour in range(horizon_hours)]
+        slots = np.array([hour_of_week(t) for t in times])
+        rows = slice(None) if roads is None else np.asarray(roads)
+
+        matrix = self.level[rows, None] + self.seasonal[rows][:, slots]
+        return times, np.clip(matrix, 0.0, 1.0).astype(np.float32)
+
+    def forecast_std(self, roads=None):
+        """One-step forecast standard deviation per road"""
+        rows = slice(None) if roads is None else np.asarray(roads)
+        return np.sqrt(self.error_var[rows])
+
+    def save(self, path):
+        """Save the model state to a .npz file"""
+        np.savez(
+            path,
+            level=self.level,
+            seasonal=self.seasonal,
+            error_var=self.error_var,
+            observations=self.observations,
+            params=np.array([self.alpha, self.gamma, self.beta]),
+            last_update=np.array(self.last_update.isoformat() if self.last_update else '')
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load model state saved with save()"""
+        with np.load(path) as state:
+            alpha, gamma, beta = state['params']
+            model = cls(len(state['level']), alpha=float(alpha), gamma=float(gamma), beta=float(beta))
+            model.level = state['level'].astype(np.float32)
+            model.seasonal = state['seasonal'].astype(np.float32)
+            model.error_var = state['error_var'].astype(np.float32)
+            model.observations = state['observations'].astype(np.int64)
+            last_update = str(state['last_update'])
+            model.last_update = datetime.fromisoformat(last_update) if last_update else None
+        return model
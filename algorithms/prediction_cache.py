@@ -0,0 +1,106 @@
+import threading
+from datetime import datetime, timedelta
+from algorithms.traffic_calendar import get_traffic_calendar
+from algorithms.traffic_prediction import get_future_traffic_predictions, predict_traffic_matrix
+
+class HourBucketCache:
+    """
+    Process-wide cache whose entries expire at the next hour boundary
+    
+    Keys are prefixed with the current local hour bucket, so every session in
+    the same hour shares one entry. Concurrent misses on the same key compute
+    once; the other callers wait for that result.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hour_bucket(now=None):
+        """Start of the local hour containing `now`"""
+        now = now or datetime.now()
+        return now.replace(minute=0, second=0, microsecond=0)
+
+    def _evict_expired(self, bucket):
+        for key in [key for key in self._entries if key[0] != bucket]:
+            del self._entries[key]
+        for key in [key for key in self._key_locks if key[0] != bucket]:
+            del self._key_locks[key]
+
+    def get_or_compute(self, key, compute, now=None):
+        """Return the cached value for `key` in this hour, calling compute(bucket) on a miss"""
+        bucket = self.hour_bucket(now)
+        full_key = (bucket,) + tuple(key)
+        
+        with self._lock:
+            self._evict_expired(bucket)
+            if full_key in self._entries:
+                self.hits += 1
+                return self._entries[full_key]
+            key_lock = self._key_locks.setdefault(full_key, threading.Lock())
+        
+        with key_lock:
+            with self._lock:
+                if full_key in self._entries:
+                    self.hits += 1
+                    return self._entries[full_key]
+            value = compute(bucket)
+            with self._lock:
+                self.misses += 1
+                self._entries[full_key] = value
+            return value
+
+    def expires_at(self, now=None):
+        """When the current entries expire"""
+        return self.hour_bucket(now) + timedelta(hours=1)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+
+_prediction_cache = HourBucketCache()
+
+def get_prediction_cache():
+    """The process-wide prediction cache shared by all sessions"""
+    return _prediction_cache
+
+def _bucket_seed(seed, bucket):
+    # Different noise every hour, identical within the hour
+    return [seed, int(bucket.timestamp()) // 3600]
+
+def get_cached_future_predictions(hours_ahead=3, dataset_version='', seed=0, now=None):
+    """
+    Network predictions from the start of the current hour, cached until the next hour
+    
+    Keyed by (hour bucket, horizon, dataset version, calendar file mtime,
+    seed), so repeated reruns and concurrent sessions get the same numbers
+    within the hour, and an edited traffic calendar takes effect at once.
+    """
+    calendar_version = get_traffic_calendar().mtime
+    
+    def compute(bucket):
+        return tuple(get_future_traffic_predictions(hours_ahead, start_time=bucket, seed=_bucket_seed(seed, bucket)))
+    
+    return list(_prediction_cache.get_or_compute(
+        ('network', hours_ahead, dataset_version, calendar_version, seed), compute, now
+    ))
+
+def get_cached_traffic_matrix(roads, intersections=None, hours_ahead=48, dataset_version='', seed=0, now=None):
+    """Per-road prediction matrix for the current hour and traffic calendar; the returned array is read-only"""
+    calendar = get_traffic_calendar()
+    
+    def compute(bucket):
+        times, matrix = predict_traffic_matrix(
+            roads, intersections, hours_ahead, start_time=bucket, seed=_bucket_seed(seed, bucket), calendar=calendar
+        )
+        matrix.flags.writeable = False
+        return times, matrix
+    
+    return _prediction_cache.get_or_compute(
+        ('roads', hours_ahead, dataset_version, calendar.mtime, seed), compute, now
+    )
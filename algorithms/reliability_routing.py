@@ -0,0 +1,117 @@
+import heapq
+import numpy as np
+from math import sqrt
+from statistics import NormalDist
+
+def percentile_to_k(percentile):
+    """Standard-normal multiplier for a percentile, e.g. 0.9 -> 1.28"""
+    return NormalDist().inv_cdf(percentile)
+
+def sample_edge_travel_times(G, weather_system, season, n_samples=1000, hour=None, seed=None,
+                             base_speed=60, closure_delay=240, traffic_spread=0.1):
+    """
+    Sample travel times (minutes) for every edge under weather and traffic uncertainty
+
+    Each sample draws a weather condition per edge from the WeatherImpact
+    season/zone distribution and log-normal demand noise, then converts the
+    resulting traffic level to a speed as the Route Optimizer does
+    (base_speed * (1 - 0.7 * traffic), at least 20 km/h). Roads closed by
+    the season or a Road Blockage add `closure_delay` minutes of waiting.
+
+    Returns (edges, samples) with samples of shape (n_samples, len(edges)).
+    """
+    rng = np.random.default_rng(seed)
+    edges = list(G.edges())
+    tables = weather_system.get_impact_tables()
+    season_code = tables['seasons'].index(season)
+
+    distance = np.array([G[u][v]['distance'] for u, v in edges], dtype=np.float64)
+    traffic = np.array([G[u][v]['traffic'] for u, v in edges], dtype=np.float64)
+    elevations = [max(G.nodes[u].get('elevation', 1000), G.nodes[v].get('elevation', 1000)) for u, v in edges]
+    zones = weather_system.get_elevation_zones(elevations)
+    route_codes = weather_system.get_route_type_codes(
+        [G.nodes[v].get('type') if G.nodes[v].get('type') in weather_system.special_routes else None for u, v in edges]
+    )
+
+    hours = rng.integers(0, 24, size=n_samples) if hour is None else np.full(n_samples, hour)
+    codes = np.empty((n_samples, len(edges)), dtype=np.intp)
+    for h in np.unique(hours):
+        rows = np.flatnonzero(hours == h)
+        codes[rows] = weather_system.sample_conditions(
+            np.tile(zones, len(rows)), season, int(h), rng
+        ).reshape(len(rows), len(edges))
+
+    multiplier = tables['multiplier'][codes, zones, route_codes, season_code]
+    closed = tables['closed'][codes, zones, route_codes, season_code]
+    if 'Road Blockage' in tables['conditions']:
+        closed |= codes == tables['conditions'].index('Road Blockage')
+
+    level = np.minimum(traffic * rng.lognormal(0.0, traffic_spread, size=codes.shape) * multiplier, 1.0)
+    speed = np.maximum(20, base_speed * (1 - level * 0.7))
+    samples = distance / speed * 60 + closed * closure_delay
+    return edges, samples
+
+def edge_time_moments(G, weather_system, season, n_samples=1000, seed=None, **kwargs):
+    """Mean and variance of travel time per directed edge: {(u, v): (mean, variance)}"""
+    edges, samples = sample_edge_travel_times(G, weather_system, season, n_samples, seed=seed, **kwargs)
+    means = samples.mean(axis=0)
+    variances = samples.var(axis=0)
+    return {edge: (float(mean), float(var)) for edge, mean, var in zip(edges, means, variances)}
+
+def reliability_route(G, source, target, moments, percentile=0.9):
+    """
+    Route minimizing a travel-time percentile, mean + k * stddev
+
+    Label-setting search with moment propagation: each label carries the
+    path's mean and variance (edges treated as independent, so both add).
+    Labels dominated in (mean, variance) at a node are pruned; since the
+    objective only grows along a path, the first label settled at the
+    target is optimal.
+
+    Parameters:
+    - moments: {(u, v): (mean, variance)} per directed edge, e.g. from edge_time_moments
+    - percentile: Target on-time probability, e.g. 0.9 for P90
+
+    Returns (percentile_time, path, mean, stddev); (inf, [], inf, inf) if unreachable.
+    """
+    if source not in G or target not in G:
+        return float('inf'), [], float('inf'), float('inf')
+
+    if percentile < 0.5:
+        raise ValueError("percentile must be at least 0.5 for the label-setting search")
+    k = percentile_to_k(percentile)
+    labels = {node: [] for node in G.nodes()}  # Non-dominated (mean, variance) per node
+    counter = 0
+    # (objective, tie-breaker, mean, variance, node, parent label)
+    heap = [(0.0, counter, 0.0, 0.0, source, None)]
+
+    while heap:
+        label = heapq.heappop(heap)
+        objective, _, mean, var, node, parent = label
+
+        # Skip labels dominated after they were queued
+        if parent is not None and (mean, var) not in labels[node]:
+            continue
+
+        if node == target:
+            path = []
+            while label is not None:
+                path.append(label[4])
+                label = label[5]
+            path.reverse()
+            return objective, path, mean, sqrt(var)
+
+        for neighbor in G.neighbors(node):
+            edge_mean, edge_var = moments[(node, neighbor)]
+            new_mean, new_var = mean + edge_mean, var + edge_var
+
+            # Skip if an existing label at the neighbor is at least as good on both moments
+            if any(m <= new_mean and v <= new_var for m, v in labels[neighbor]):
+                continue
+            labels[neighbor] = [(m, v) for m, v in labels[neighbor] if not (new_mean <= m and new_var <= v)]
+            labels[neighbor].append((new_mean, new_var))
+
+            counter += 1
+            heapq.heappush(heap, (new_mean + k * sqrt(new_var), counter, new_mean, new_var, neighbor, label))
+
+    return float('inf'), [], float('inf'), float('inf')
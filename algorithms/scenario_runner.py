@@ -0,0 +1,201 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from algorithms.graph_arrays import CompiledGraph, share_arrays, share_graph, attach_graph, attach_arrays
+from algorithms.traffic_assignment import gravity_demand, free_flow_times, road_capacities, frank_wolfe_assignment
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'uttarakhand_realistic_data.json')
+
+RESULT_SCHEMA = pa.schema([
+    ('scenario', pa.string()),
+    ('total_cost', pa.float64()),          # Vehicle-minutes per hour at equilibrium
+    ('total_trips', pa.float64()),
+    ('dropped_trips', pa.float64()),       # Trips to or from closed intersections, left out of total_cost
+    ('unreachable_pairs', pa.int64()),
+    ('mean_volume_capacity', pa.float64()),
+    ('max_volume_capacity', pa.float64()),
+    ('top_congested_roads', pa.list_(pa.string())),
+    ('iterations', pa.int64()),
+    ('relative_gap', pa.float64()),
+    ('seconds', pa.float64())
+])
+
+def expand_scenarios(spec, data):
+    """
+    Scenario list from a spec: explicit `scenarios` plus generated `sweeps`
+
+    Sweep entries:
+    - {"close_each": "<node type>"}: one closure scenario per intersection of that type
+    - {"parameter": "demand_scale" | "capacity_scale" | "speed_scale", "values": [...],
+       "name": "label with {value}"}: one scenario per value
+    """
+    scenarios = [dict(scenario) for scenario in spec.get('scenarios', [])]
+    for sweep in spec.get('sweeps', []):
+        if 'close_each' in sweep:
+            for node_id, node in data['intersections'].items():
+                if node.get('type') == sweep['close_each']:
+                    scenarios.append({'name': f"close {node['name']}", 'closed_nodes': [node_id]})
+        else:
+            label = sweep.get('name', sweep['parameter'] + ' x{value}')
+            for value in sweep['values']:
+                scenarios.append({'name': label.format(value=value), sweep['parameter']: value})
+    return scenarios
+
+def compile_overlay(scenario, graph, zones, road_names):
+    """
+    Numeric overlay for one scenario, small enough to send to a worker
+
+    Scenario keys (all optional): closed_nodes (IDs), closed_roads (names),
+    demand_scale, zone_demand ({node ID: factor} on trips to and from it),
+    capacity_scale (e.g. monsoon lane loss) and speed_scale. Trips to and
+    from closed nodes are dropped rather than left unreachable.
+    """
+    closed = np.zeros(graph.num_edges, dtype=bool)
+    closed_nodes = [graph.node_index[node] for node in scenario.get('closed_nodes', [])]
+    closed |= np.isin(graph.tails, closed_nodes) | np.isin(graph.heads, closed_nodes)
+    road_index = {name: i for i, name in enumerate(road_names)}
+    closed_roads = [road_index[name] for name in scenario.get('closed_roads', [])]
+    closed |= np.isin(graph.edge_data['road'], closed_roads)
+
+    zone_row = {zone: i for i, zone in enumerate(zones)}
+    return {
+        'name': scenario['name'],
+        'closed_edges': np.flatnonzero(closed),
+        'closed_zones': [zone_row[node] for node in scenario.get('closed_nodes', []) if node in zone_row],
+        'demand_scale': scenario.get('demand_scale', 1.0),
+        'zone_demand': {zone_row[zone]: factor for zone, factor in scenario.get('zone_demand', {}).items()},
+        'capacity_scale': scenario.get('capacity_scale', 1.0),
+        'speed_scale': scenario.get('speed_scale', 1.0)
+    }
+
+# Per-process state, attached once by the pool initializer
+_worker = {}
+
+def _init_worker(graph_descriptor, demand_descriptor, settings):
+    blocks, graph, extras = attach_graph(graph_descriptor)
+    demand_blocks, arrays = attach_arrays(demand_descriptor)
+    _worker.update(blocks=blocks + demand_blocks, graph=graph, extras=extras,
+                   demand=arrays['demand'], settings=settings)
+
+def _run_scenario(overlay):
+    started = time.time()
+    graph, extras, settings = _worker['graph'], _worker['extras'], _worker['settings']
+
+    # The overlay only touches private copies of the per-edge and demand arrays
+    free_flow = extras['free_flow'] / overlay['speed_scale']
+    free_flow[overlay['closed_edges']] = np.inf
+    capacity = extras['capacity'] * overlay['capacity_scale']
+    demand = _worker['demand'] * overlay['demand_scale']
+    for row, factor in overlay['zone_demand'].items():
+        demand[row, :] *= factor
+        demand[:, row] *= factor
+
+    # Demand at a closed intersection cannot be served; count it instead of letting it vanish from total_cost
+    closed_zones = overlay['closed_zones']
+    total_trips = float(demand.sum())
+    demand[closed_zones, :] = 0.0
+    demand[:, closed_zones] = 0.0
+    dropped_trips = total_trips - float(demand.sum())
+
+    result = frank_wolfe_assignment(
+        graph, demand, settings['zones'],
+        max_iterations=settings['max_iterations'],
+        tolerance=settings['tolerance'],
+        free_flow=free_flow,
+        capacity=capacity
+    )
+    volume_capacity = result['volume_capacity']
+    top_edges = np.argsort(volume_capacity)[::-1]
+    top_roads = list(dict.fromkeys(graph.edge_data['road'][top_edges].tolist()))[:settings['top_roads']]
+
+    return {
+        'scenario': overlay['name'],
+        'total_cost': result['total_cost'],
+        'total_trips': total_trips,
+        'dropped_trips': dropped_trips,
+        'unreachable_pairs': result['unreachable_pairs'],
+        'mean_volume_capacity': float(volume_capacity.mean()),
+        'max_volume_capacity': float(volume_capacity.max()),
+        'top_congested_roads': top_roads,
+        'iterations': result['iterations'],
+        'relative_gap': result['relative_gap'],
+        'seconds': time.time() - started
+    }
+
+def run_scenarios(spec, output_path, n_workers=1, data=None):
+    """
+    Evaluate every scenario in a spec and stream KPIs to a Parquet file
+
+    The base network, its free-flow times and capacities, and the base OD
+    demand are placed in shared memory once; each worker process maps
+    them at start-up and only receives a small per-scenario overlay.
+    Results are written as they complete, one row group per scenario,
+    so memory stays flat however many scenarios are swept.
+
+    Parameters:
+    - spec: Dict as loaded from a scenario spec file (see expand_scenarios);
+      optional keys total_trips, max_iterations, tolerance, top_roads
+    - output_path: Parquet file to write
+    - n_workers: Worker processes
+    - data: Loaded dataset (default: read from spec['data_path'])
+
+    Returns the number of scenarios written.
+    """
+    if data is None:
+        with open(spec.get('data_path', DEFAULT_DATA_PATH), 'r') as f:
+            data = json.load(f)
+    road_names = [road['name'] for road in data['roads']]
+    graph = CompiledGraph.from_data(data)
+    zones, demand = gravity_demand(graph, total_trips=spec.get('total_trips', 20000))
+    overlays = [compile_overlay(scenario, graph, zones, road_names) for scenario in expand_scenarios(spec, data)]
+    settings = {
+        'max_iterations': spec.get('max_iterations', 30),
+        'tolerance': spec.get('tolerance', 1e-3),
+        'top_roads': spec.get('top_roads', 5),
+        'zones': zones
+    }
+
+    graph_blocks, graph_descriptor = share_graph(graph, {
+        'free_flow': free_flow_times(graph),
+        'capacity': road_capacities(graph)
+    })
+    demand_blocks, demand_descriptor = share_arrays({'demand': demand})
+
+    written = 0
+    try:
+        with pq.ParquetWriter(output_path, RESULT_SCHEMA) as writer, ProcessPoolExecutor(
+            max_workers=max(1, n_workers),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(graph_descriptor, demand_descriptor, settings)
+        ) as pool:
+            futures = [pool.submit(_run_scenario, overlay) for overlay in overlays]
+            for future in as_completed(futures):
+                row = future.result()
+                row['top_congested_roads'] = [road_names[road] for road in row['top_congested_roads']]
+                writer.write_table(pa.Table.from_pylist([row], schema=RESULT_SCHEMA))
+                written += 1
+    finally:
+        for block in graph_blocks + demand_blocks:
+            block.close()
+            block.unlink()
+    return written
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a what-if scenario sweep and write per-scenario KPIs')
+    parser.add_argument('spec', help='Scenario spec JSON file')
+    parser.add_argument('output', help='Parquet file for the results')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes')
+    args = parser.parse_args()
+
+    with open(args.spec, 'r') as f:
+        scenario_spec = json.load(f)
+    started = time.time()
+    count = run_scenarios(scenario_spec, args.output, n_workers=args.workers)
+    print(f"Wrote {count} scenarios to {args.output} in {time.time() - started:.1f}s")
@@ -0,0 +1,84 @@
+import bisect
+import difflib
+
+class NodeSearchIndex:
+    """
+    Case-insensitive prefix and fuzzy search over intersection names and IDs
+    Built once per dataset version so widgets only receive the top matches
+    """
+
+    def __init__(self, intersections):
+        self.names = {node_id: node_data['name'] for node_id, node_data in intersections.items()}
+
+        # Sorted (key, node_id) array; every word of a name is indexed so that
+        # "temple" finds "Kedarnath Temple" as well as names starting with it
+        entries = set()
+        for node_id, name in self.names.items():
+            entries.add((node_id.lower(), node_id))
+            entries.add((name.lower(), node_id))
+            for word in name.lower().replace('/', ' ').split()[1:]:
+                entries.add((word, node_id))
+        entries = sorted(entries)
+        self.keys = [key for key, _ in entries]
+        self.ids = [node_id for _, node_id in entries]
+
+        # Distinct lowercase names for fuzzy matching
+        self.name_ids = {}
+        for node_id, name in self.names.items():
+            self.name_ids.setdefault(name.lower(), []).append(node_id)
+        self.sorted_ids = sorted(self.names, key=lambda node_id: self.names[node_id].lower())
+
+    def __len__(self):
+        return len(self.names)
+
+    def label(self, node_id):
+        """Display label for a node, e.g. 'Dehradun (DEH)'"""
+        return f"{self.names.get(node_id, node_id)} ({node_id})"
+
+    def prefix_matches(self, query, limit=20):
+        """Nodes whose ID, name or any word of the name starts with the query"""
+        query = query.strip().lower()
+        matches = []
+        seen = set()
+        start = bisect.bisect_left(self.keys, query)
+        for i in range(start, len(self.keys)):
+            if not self.keys[i].startswith(query):
+                break
+            node_id = self.ids[i]
+            if node_id not in seen:
+                seen.add(node_id)
+                matches.append(node_id)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def fuzzy_matches(self, query, limit=20, cutoff=0.6):
+        """Nodes whose name is close to the query (handles typos like 'kedarnat')"""
+        query = query.strip().lower()
+        matches = []
+        for name in difflib.get_close_matches(query, self.name_ids.keys(), n=limit, cutoff=cutoff):
+            matches.extend(self.name_ids[name])
+        return matches[:limit]
+
+    def search(self, query, limit=20, default=None):
+        """
+        Return up to `limit` node IDs for a typeahead widget
+
+        Prefix matches come first, fuzzy matches fill the remaining slots.
+        An empty query lists nodes alphabetically, with `default` first if given.
+        """
+        query = (query or '').strip()
+        if not query:
+            matches = self.sorted_ids[:limit]
+        else:
+            matches = self.prefix_matches(query, limit)
+            if len(matches) < limit:
+                for node_id in self.fuzzy_matches(query, limit):
+                    if node_id not in matches:
+                        matches.append(node_id)
+                matches = matches[:limit]
+
+        if default is not None and default in self.names and (not query or default in matches):
+            matches = [default] + [node_id for node_id in matches if node_id != default]
+            matches = matches[:limit]
+        return matches
@@ -0,0 +1,169 @@
+import numpy as np
+from algorithms.graph_arrays import shortest_path_tree, tree_depths, accumulate_tree_loads
+
+# Vehicles per hour per lane by road type
+LANE_CAPACITY = {
+    'highway': 1800,
+    'rural': 900,
+    'hill': 800,
+    'mountain': 600
+}
+
+# Free-flow speed in km/h by road type
+FREE_FLOW_SPEED = {
+    'highway': 60,
+    'rural': 45,
+    'hill': 40,
+    'mountain': 30
+}
+
+DEFAULT_LANE_CAPACITY = 900
+DEFAULT_FREE_FLOW_SPEED = 40
+
+# Relative demand generated by each intersection type in the gravity model
+ZONE_WEIGHTS = {
+    'capital': 10,
+    'city': 6,
+    'char_dham': 4,
+    'pilgrimage': 3,
+    'tourist': 3,
+    'town': 2,
+    'pass': 0.5,
+    'village': 0.5,
+    'intersection': 0.2
+}
+
+def road_capacities(graph):
+    """Hourly capacity of every edge: lanes times the per-lane capacity of its type"""
+    lane_capacity = np.array([LANE_CAPACITY.get(road_type, DEFAULT_LANE_CAPACITY) for road_type in graph.edge_data['type']])
+    return np.maximum(graph.edge_data['lanes'], 1) * lane_capacity.astype(np.float64)
+
+def free_flow_times(graph):
+    """Free-flow travel time of every edge in minutes"""
+    speed = np.array([FREE_FLOW_SPEED.get(road_type, DEFAULT_FREE_FLOW_SPEED) for road_type in graph.edge_data['type']])
+    return graph.edge_data['distance'] / speed * 60
+
+def bpr_times(free_flow, flows, capacity, alpha=0.15, beta=4):
+    """BPR volume-delay function: t0 * (1 + alpha * (flow / capacity) ** beta)"""
+    return free_flow * (1 + alpha * (flows / capacity) ** beta)
+
+def gravity_demand(graph, total_trips=20000, zones=None, deterrence=0.02):
+    """
+    Hourly OD demand from a gravity model over intersection types
+
+    Trips between two zones grow with the product of their ZONE_WEIGHTS
+    and fall off exponentially with straight-line distance (~km).
+
+    Returns (zones, demand) with demand of shape (len(zones), len(zones)).
+    """
+    zones = [graph.nodes[node] for node in graph.active_nodes] if zones is None else list(zones)
+    index = [graph.node_index[zone] for zone in zones]
+    weights = np.array([ZONE_WEIGHTS.get(node_type, 1) for node_type in graph.node_data['type'][index]], dtype=np.float64)
+    pos = np.asarray(graph.node_data['pos'][index].tolist(), dtype=np.float64) * 111
+    separation = np.sqrt(((pos[:, None, :] - pos[None, :, :]) ** 2).sum(axis=2))
+
+    demand = np.outer(weights, weights) * np.exp(-deterrence * separation)
+    np.fill_diagonal(demand, 0.0)
+    return zones, demand * (total_trips / demand.sum())
+
+def all_or_nothing(graph, costs, origins, demand, destinations):
+    """
+    Load each origin's demand onto its shortest path tree
+
+    One Dijkstra per origin; loads are then pushed back up the tree level
+    by level. Returns (edge_flows, shortest_costs, unreachable_pairs) where
+    shortest_costs is the demand-weighted total of shortest path costs and
+    unreachable_pairs counts OD pairs with demand but no path.
+    """
+    flows = np.zeros(graph.num_edges)
+    shortest_costs = 0.0
+    unreachable_pairs = 0
+    node_loads = np.zeros(graph.num_nodes)
+
+    for row, origin in enumerate(origins):
+        if not demand[row].any():
+            continue
+        dist, pred_edge, order = shortest_path_tree(graph, origin, costs)
+        node_loads[:] = 0.0
+        np.add.at(node_loads, destinations, demand[row])
+        reachable = np.isfinite(dist)
+        unreachable_pairs += int(np.count_nonzero((demand[row] > 0) & ~reachable[destinations]))
+        node_loads[~reachable] = 0.0
+
+        flows += accumulate_tree_loads(graph, pred_edge, tree_depths(graph, pred_edge, order), node_loads)
+        shortest_costs += float(node_loads @ np.where(reachable, dist, 0.0))
+    return flows, shortest_costs, unreachable_pairs
+
+def _line_search(flows, direction, free_flow, capacity, alpha, beta, iterations=30):
+    # Bisection on the derivative of the Beckmann objective along the direction
+    low, high = 0.0, 1.0
+    step = direction - flows
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        slope = step @ bpr_times(free_flow, flows + middle * step, capacity, alpha, beta)
+        if slope > 0:
+            high = middle
+        else:
+            low = middle
+    return (low + high) / 2
+
+def frank_wolfe_assignment(graph, demand, zones=None, max_iterations=50, tolerance=1e-4, alpha=0.15, beta=4,
+                           free_flow=None, capacity=None):
+    """
+    User-equilibrium static traffic assignment (Frank-Wolfe)
+
+    Iterates all-or-nothing loads on the current BPR travel times, moving
+    flows towards them by an exact line search. The trees built for each
+    iteration's descent direction also give that iteration's relative gap,
+    so convergence checking costs no extra shortest path searches.
+
+    Parameters:
+    - graph: CompiledGraph or GraphView with 'distance', 'lanes' and 'type' edge data
+    - demand: (zones, zones) hourly trips matrix
+    - zones: Node IDs for the demand rows/columns (default: all active nodes)
+    - tolerance: Stop when the relative gap falls below this
+    - alpha, beta: BPR parameters
+    - free_flow, capacity: Optional per-edge overrides of free_flow_times and
+      road_capacities; an infinite free-flow time closes the edge
+
+    Returns a dict with flows, times (minutes), volume_capacity per edge,
+    iterations, relative_gap, gap_history, total_cost (vehicle-minutes)
+    and unreachable_pairs.
+    """
+    zones = [graph.nodes[node] for node in graph.active_nodes] if zones is None else list(zones)
+    zone_index = np.array([graph.node_index[zone] for zone in zones], dtype=np.intp)
+    demand = np.asarray(demand, dtype=np.float64)
+    free_flow = free_flow_times(graph) if free_flow is None else np.asarray(free_flow, dtype=np.float64)
+    free_flow = graph.masked_weights(free_flow)
+    capacity = road_capacities(graph) if capacity is None else np.asarray(capacity, dtype=np.float64)
+    open_edges = np.isfinite(free_flow)
+
+    flows, _, unreachable_pairs = all_or_nothing(graph, free_flow, zone_index, demand, zone_index)
+    gap_history = []
+    relative_gap = float('inf')
+
+    for iteration in range(1, max_iterations + 1):
+        times = bpr_times(free_flow, flows, capacity, alpha, beta)
+        direction, shortest_costs, _ = all_or_nothing(graph, times, zone_index, demand, zone_index)
+
+        total_costs = float(flows[open_edges] @ times[open_edges])
+        relative_gap = (total_costs - shortest_costs) / total_costs if total_costs > 0 else 0.0
+        gap_history.append(relative_gap)
+        if relative_gap < tolerance:
+            break
+
+        step = _line_search(flows[open_edges], direction[open_edges], free_flow[open_edges],
+                            capacity[open_edges], alpha, beta)
+        flows = flows + step * (direction - flows)
+
+    times = bpr_times(free_flow, flows, capacity, alpha, beta)
+    return {
+        'flows': flows,
+        'times': times,
+        'volume_capacity': flows / capacity,
+        'iterations': iteration,
+        'relative_gap': relative_gap,
+        'gap_history': gap_history,
+        'total_cost': float(flows[open_edges] @ times[open_edges]),
+        'unreachable_pairs': unreachable_pairs
+    }
@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import numpy as np
+
+DEFAULT_CALENDAR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'traffic_calendar.json')
+
+# Used only when the config file cannot be read: no calendar effects, plain base traffic
+FALLBACK_PATTERNS = {
+    'base_traffic': 0.4,
+    'hourly': {'weekday': {}, 'weekend': {}},
+    'seasonal': {},
+    'events': {}
+}
+
+DAY_TYPES = ['weekday', 'weekend']
+
+def _pattern_months(data):
+    """Months a seasonal pattern or event applies to ('months' list or single 'month')"""
+    months = data.get('months', data.get('month'))
+    return months if isinstance(months, list) else [months]
+
+class TrafficCalendar:
+    """
+    Hourly, seasonal and special-event patterns compiled into one factor tensor
+    
+    The tensor has shape (12, 2, 24, num_route_classes) and is indexed by
+    (month - 1, is_weekend, hour, route_class). Route class 0 ('network') applies
+    every event network-wide, as the original scalar prediction did; class 1
+    ('general') applies none; every other class is a place named in an event's
+    affected_routes (e.g. 'Haridwar' carries both Kanwar Yatra and Kumbh Mela).
+    
+    Patterns are read from `path` (data/traffic_calendar.json by default)
+    unless given directly. A compile publishes all derived state in one
+    assignment, so a reader never mixes a reloaded tensor with old classes.
+    """
+
+    def __init__(self, patterns=None, path=None):
+        self.path = path
+        self.mtime = None
+        self.load_error = None
+        if patterns is None:
+            self.path = path or DEFAULT_CALENDAR_PATH
+            patterns = self._read(self.path)
+        self.compile(patterns)
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a calendar from a JSON config file"""
+        return cls(path=path)
+
+    def _read(self, path):
+        with open(path, 'r') as f:
+            patterns = json.load(f)
+        self.mtime = os.path.getmtime(path)
+        return patterns
+
+    def compile(self, patterns):
+        """Compile a patterns dict into the lookup tensor"""
+        hourly_patterns = patterns['hourly']
+        seasonal_patterns = patterns['seasonal']
+        special_events = patterns['events']
+        
+        places = sorted({place for data in special_events.values() for place in data.get('affected_routes', [])})
+        route_classes = ['network', 'general'] + places
+        class_index = {name: i for i, name in enumerate(route_classes)}
+        tensor = np.ones((12, len(DAY_TYPES), 24, len(route_classes)), dtype=np.float32)
+        
+        for day_type, pattern_key in enumerate(DAY_TYPES):
+            for hour in range(24):
+                # First matching period wins
+                for period, data in hourly_patterns[pattern_key].items():
+                    if hour in data['hours']:
+                        tensor[:, day_type, hour, :] *= data['factor']
+                        break
+        
+        for month in range(1, 13):
+            for season, data in seasonal_patterns.items():
+                if month in _pattern_months(data):
+                    tensor[month - 1] *= data['factor']
+            for event, data in special_events.items():
+                if month in _pattern_months(data):
+                    tensor[month - 1, :, :, 0] *= data['factor']
+                    for place in set(data.get('affected_routes', [])):
+                        tensor[month - 1, :, :, class_index[place]] *= data['factor']
+        
+        self._compiled = {
+            'patterns': patterns,
+            'base_traffic': float(patterns['base_traffic']),
+            'route_classes': route_classes,
+            'class_index': class_index,
+            'tensor': tensor
+        }
+
+    @property
+    def patterns(self):
+        return self._compiled['patterns']
+
+    @property
+    def base_traffic(self):
+        return self._compiled['base_traffic']
+
+    @property
+    def route_classes(self):
+        return self._compiled['route_classes']
+
+    @property
+    def class_index(self):
+        return self._compiled['class_index']
+
+    @property
+    def tensor(self):
+        return self._compiled['tensor']
+
+    @property
+    def hourly_patterns(self):
+        return self.patterns['hourly']
+
+    @property
+    def seasonal_patterns(self):
+        return self.patterns['seasonal']
+
+    @property
+    def special_events(self):
+        return self.patterns['events']
+
+    def factor(self, when, route_class='network'):
+        """Combined calendar factor for a datetime and route class (O(1) lookup)"""
+        compiled = self._compiled
+        class_id = compiled['class_index'].get(route_class, 0) if isinstance(route_class, str) else route_class
+        return float(compiled['tensor'][when.month - 1, int(when.weekday() >= 5), when.hour, class_id])
+
+    def gather(self, months, day_types, hours, route_classes):
+        """Vectorized lookup; all index arrays broadcast together (months are 1-12)"""
+        return self.tensor[np.asarray(months) - 1, day_types, hours, route_classes]
+
+    def route_class_of(self, road, intersections, compiled=None):
+        """Route class index of a road, from the first endpoint named in an event"""
+        compiled = compiled or self._compiled
+        for endpoint in (road['from'], road['to']):
+            name = intersections.get(endpoint, {}).get('name', '').lower()
+            for place in compiled['route_classes'][2:]:
+                if place.lower() in name:
+                    return compiled['class_index'][place]
+        return compiled['class_index']['general']
+
+    def compile_route_classes(self, roads, intersections):
+        """Route class index for every road, as an intp vector"""
+        compiled = self._compiled
+        return np.array([self.route_class_of(road, intersections, compiled) for road in roads], dtype=np.intp)
+
+    def save(self, path=None):
+        """Write the patterns to a JSON config file"""
+        path = path or self.path
+        with open(path, 'w') as f:
+            json.dump(self.patterns, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+
+    def reload_if_changed(self):
+        """
+        Recompile from the config file if it changed on disk
+        
+        Returns True if the tensor was rebuilt. A broken file keeps the last
+        good tensor and records the error in `load_error`.
+        """
+        if self.path is None or not os.path.exists(self.path):
+            return False
+        if os.path.getmtime(self.path) == self.mtime:
+            return False
+        try:
+            self.compile(self._read(self.path))
+            self.load_error = None
+            return True
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.mtime = os.path.getmtime(self.path)
+            self.load_error = str(e)
+            return False
+
+_shared_calendar = None
+_shared_lock = threading.Lock()
+
+def get_traffic_calendar(path=DEFAULT_CALENDAR_PATH):
+    """
+    Shared calendar for the process, hot-reloaded when the config file changes
+    
+    If the config file cannot be read, the calendar starts from
+    FALLBACK_PATTERNS with the error in `load_error`, and picks the file up
+    once it is fixed.
+    """
+    global _shared_calendar
+    with _shared_lock:
+        if _shared_calendar is None or _shared_calendar.path != path:
+            try:
+                _shared_calendar = TrafficCalendar.from_file(path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                _shared_calendar = TrafficCalendar(FALLBACK_PATTERNS, path=path)
+                _shared_calendar.load_error = str(e)
+        else:
+            _shared_calendar.reload_if_changed()
+        return _shared_calendar
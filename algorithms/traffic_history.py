@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import numpy as np
+from datetime import datetime
+
+class TrafficHistory:
+    """
+    Fixed-capacity ring buffer of traffic snapshots backed by memory-mapped files
+
+    Layout of the history directory:
+    - meta.json: capacity, number of roads and dtype (written once)
+    - traffic.dat: (capacity, num_roads) snapshot matrix
+    - timestamps.dat: (capacity,) int64 epoch seconds per snapshot
+    - state.dat: int64 [head, count], updated on every append
+
+    Appends are O(1) and memory stays bounded by the OS page cache. Reads
+    return views into the mapped files, so slicing by time range or road
+    does not copy unless a range wraps around the end of the buffer.
+    """
+
+    def __init__(self, directory, num_roads=None, capacity=60 * 24 * 90, dtype='float16'):
+        self.directory = directory
+        meta_path = os.path.join(directory, 'meta.json')
+
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if num_roads is not None and num_roads != meta['num_roads']:
+                raise ValueError(
+                    f"History at {directory} has {meta['num_roads']} roads, expected {num_roads}"
+                )
+            mode = 'r+'
+        else:
+            if num_roads is None:
+                raise ValueError(f"No history at {directory}; num_roads is required to create one")
+            os.makedirs(directory, exist_ok=True)
+            meta = {'num_roads': num_roads, 'capacity': capacity, 'dtype': np.dtype(dtype).name}
+            mode = 'w+'
+
+        self.num_roads = meta['num_roads']
+        self.capacity = meta['capacity']
+        self.dtype = np.dtype(meta['dtype'])
+        self._lock = threading.Lock()
+
+        self.traffic = np.memmap(os.path.join(directory, 'traffic.dat'), dtype=self.dtype,
+                                 mode=mode, shape=(self.capacity, self.num_roads))
+        self.timestamps = np.memmap(os.path.join(directory, 'timestamps.dat'), dtype=np.int64,
+                                    mode=mode, shape=(self.capacity,))
+        self._state = np.memmap(os.path.join(directory, 'state.dat'), dtype=np.int64,
+                                mode=mode, shape=(2,))
+
+        # meta.json is written last so a half-created history is never reopened
+        if mode == 'w+':
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+
+    @property
+    def head(self):
+        """Physical row the next snapshot is written to"""
+        return int(self._state[0])
+
+    def __len__(self):
+        return int(self._state[1])
+
+    def append(self, snapshot, when=None):
+        """Store one network snapshot (one value per road)"""
+        when = when or datetime.now()
+        with self._lock:
+            head = self.head
+            self.traffic[head] = snapshot
+            self.timestamps[head] = int(when.timestamp())
+            self._state[0] = (head + 1) % self.capacity
+            self._state[1] = min(len(self) + 1, self.capacity)
+
+    def last_timestamp(self):
+        """Time of the newest snapshot, or None if empty"""
+        if not len(self):
+            return None
+        return datetime.fromtimestamp(int(self.timestamps[(self.head - 1) % self.capacity]))
+
+    def _physical_segments(self):
+        # Oldest-to-newest contiguous row ranges in the mapped files
+        count, head = len(self), self.head
+        if count < self.capacity:
+            return [(0, count)] if count else []
+        if head == 0:
+            return [(0, self.capacity)]
+        return [(head, self.capacity), (0, head)]
+
+    def segments(self, start=None, end=None, roads=None):
+        """
+        Yield (timestamps, traffic) views for snapshots with start <= time < end
+
+        Each yielded pair is a zero-copy view of one contiguous run of rows;
+        at most two are produced. `roads` selects columns (an int or slice
+        keeps the view zero-copy).
+        """
+        start_ts = int(start.timestamp()) if start is not None else None
+        end_ts = int(end.timestamp()) if end is not None else None
+        columns = slice(None) if roads is None else roads
+
+        for first, last in self._physical_segments():
+            times = self.timestamps[first:last]
+            lo = np.searchsorted(times, start_ts, side='left') if start_ts is not None else 0
+            hi = np.searchsorted(times, end_ts, side='left') if end_ts is not None else len(times)
+            if hi > lo:
+                yield times[lo:hi], self.traffic[first + lo:first + hi, columns]
+
+    def window(self, start=None, end=None, roads=None):
+        """
+        (timestamps, traffic) for a time range as single arrays
+
+        Zero-copy when the range does not wrap around the buffer.
+        """
+        parts = list(self.segments(start, end, roads))
+        if not parts:
+            shape = (0,) + self.traffic[:0, slice(None) if roads is None else roads].shape[1:]
+            return np.empty(0, dtype=np.int64), np.empty(shape, dtype=self.dtype)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def road_series(self, road, start=None, end=None):
+        """Time series for one road"""
+        return self.window(start, end, roads=road)
+
+    def flush(self):
+        """Write pending changes to disk"""
+        self.traffic.flush()
+        self.timestamps.flush()
+        self._state.flush()
@@ -0,0 +1,222 @@
+import numpy as np
+from datetime import datetime, timedelta
+from algorithms.traffic_calendar import get_traffic_calendar
+from algorithms.traffic_prediction import compile_road_factors
+from algorithms.weather_field import WeatherField
+
+# Traffic ranges per road type: (peak hours, off peak, weekend)
+TRAFFIC_PATTERNS = {
+    'highway': {
+        'peak_hours': (0.6, 0.9),    # 7-9 AM and 5-7 PM
+        'off_peak': (0.3, 0.6),      # Other hours
+        'weekend': (0.4, 0.7)         # Weekend traffic
+    },
+    'hill': {
+        'peak_hours': (0.4, 0.7),
+        'off_peak': (0.2, 0.4),
+        'weekend': (0.3, 0.6)
+    },
+    'mountain': {
+        'peak_hours': (0.3, 0.6),
+        'off_peak': (0.1, 0.3),
+        'weekend': (0.2, 0.5)
+    }
+}
+
+SPEED_LIMITS = {
+    'highway': (80, 100),
+    'hill': (40, 60),
+    'mountain': (30, 50)
+}
+
+ROAD_CONDITIONS = ['excellent', 'good', 'fair', 'poor']
+HIGHWAY_LANES = [2, 3, 4]
+
+# Road types without their own entry use the highway traffic pattern,
+# the default speed limit and two lanes
+ROAD_TYPES = list(TRAFFIC_PATTERNS) + ['other']
+PERIODS = ['peak_hours', 'off_peak', 'weekend']
+DEFAULT_SPEED_LIMIT = (40, 60)
+
+def _range_tables():
+    # (road type, period, [min, max]) traffic bounds and (road type, [min, max]) speed limits
+    traffic = np.array([
+        [TRAFFIC_PATTERNS.get(road_type, TRAFFIC_PATTERNS['highway'])[period] for period in PERIODS]
+        for road_type in ROAD_TYPES
+    ], dtype=np.float64)
+    speed = np.array([SPEED_LIMITS.get(road_type, DEFAULT_SPEED_LIMIT) for road_type in ROAD_TYPES], dtype=np.int64)
+    return traffic, speed
+
+TRAFFIC_RANGES, SPEED_RANGES = _range_tables()
+
+def get_period_code(hour, is_weekend):
+    """Index into PERIODS for an hour of day"""
+    if is_weekend:
+        return PERIODS.index('weekend')
+    if (7 <= hour <= 9) or (17 <= hour <= 19):
+        return PERIODS.index('peak_hours')
+    return PERIODS.index('off_peak')
+
+def compile_road_arrays(roads, intersections, weather_system):
+    """
+    Per-road attribute arrays for the simulation step
+
+    Built once per network; every tick then works on these arrays only.
+    Returns a dict with type_codes (into ROAD_TYPES), elevations, zones
+    (weather elevation zones) and route_codes (weather route type axis).
+    """
+    type_lookup = {road_type: i for i, road_type in enumerate(ROAD_TYPES)}
+    other = type_lookup['other']
+    road_types = [road.get('type', 'highway') for road in roads]
+    elevations = np.array([
+        max(intersections[road['from']].get('elevation', 1000), intersections[road['to']].get('elevation', 1000))
+        for road in roads
+    ], dtype=np.float64)
+
+    return {
+        'type_codes': np.array([type_lookup.get(road_type, other) for road_type in road_types], dtype=np.intp),
+        'elevations': elevations,
+        'zones': weather_system.get_elevation_zones(elevations),
+        'route_codes': weather_system.get_route_type_codes(road_types)
+    }
+
+def simulate_step(road_arrays, base_traffic, weather_system, when=None, rng=None,
+                  condition_codes=None, variation=0.1):
+    """
+    Advance every road by one tick in a single vectorized update
+
+    Each road gets base traffic plus uniform noise (±variation), clipped to
+    its type's range for the period (peak, off peak or weekend), then the
+    weather multiplier for its condition, zone and route type. Roads closed
+    by the weather get 0.
+
+    Parameters:
+    - road_arrays: Output of compile_road_arrays
+    - base_traffic: Scalar or per-road base traffic level
+    - weather_system: WeatherImpact providing the impact tables
+    - when: Datetime used for the period, season and hour (default: now)
+    - rng: numpy Generator (a fresh one is created if omitted)
+    - condition_codes: Optional per-road weather codes (e.g. from a WeatherField);
+      sampled per road if omitted
+
+    Returns the new traffic state as a float array with one value per road.
+    """
+    when = when or datetime.now()
+    rng = rng if rng is not None else np.random.default_rng()
+    type_codes = road_arrays['type_codes']
+    zones = road_arrays['zones']
+
+    # Type-indexed bounds for the current period
+    bounds = TRAFFIC_RANGES[type_codes, get_period_code(when.hour, when.weekday() >= 5)]
+    traffic = np.asarray(base_traffic, dtype=np.float64) + rng.uniform(-variation, variation, size=len(type_codes))
+    traffic = np.clip(traffic, bounds[:, 0], bounds[:, 1])
+
+    season = weather_system.get_season_for_month(when.month)
+    if condition_codes is None:
+        condition_codes = weather_system.sample_conditions(zones, season, when.hour, rng)
+    tables = weather_system.get_impact_tables()
+    index = (condition_codes, zones, road_arrays['route_codes'], tables['seasons'].index(season))
+
+    traffic = np.clip(traffic * tables['multiplier'][index], 0.0, 1.0)
+    traffic[tables['closed'][index]] = 0.0
+    return traffic
+
+def sample_road_attributes(road_arrays, rng=None):
+    """
+    Random condition, lane count and speed limit per road
+
+    Returns (conditions, lanes, speed_limits): condition codes index into
+    ROAD_CONDITIONS; highways get 2-4 lanes, other roads 2.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    type_codes = road_arrays['type_codes']
+    num_roads = len(type_codes)
+
+    conditions = rng.integers(0, len(ROAD_CONDITIONS), size=num_roads)
+    lanes = np.where(
+        type_codes == ROAD_TYPES.index('highway'),
+        np.asarray(HIGHWAY_LANES)[rng.integers(0, len(HIGHWAY_LANES), size=num_roads)],
+        2
+    )
+    speed_range = SPEED_RANGES[type_codes]
+    speed_limits = rng.integers(speed_range[:, 0], speed_range[:, 1], endpoint=True)
+    return conditions, lanes, speed_limits
+
+def compile_road_endpoints(roads, intersections):
+    """(from_index, to_index, degree) arrays mapping roads onto intersection indices"""
+    node_index = {node_id: i for i, node_id in enumerate(intersections)}
+    from_index = np.array([node_index[road['from']] for road in roads], dtype=np.intp)
+    to_index = np.array([node_index[road['to']] for road in roads], dtype=np.intp)
+    degree = np.bincount(from_index, minlength=len(node_index)) + np.bincount(to_index, minlength=len(node_index))
+    return from_index, to_index, degree
+
+def run_simulation(roads, intersections, weather_system, start_time=None, duration_hours=24, tick_minutes=5,
+                   calendar=None, weather_field=None, seed=None, persistence=0.9, variation=0.05,
+                   spillover=0.3, congestion_threshold=0.7):
+    """
+    Discrete-time network traffic simulation, yielding one snapshot per tick
+
+    Each tick combines:
+    - demand from the traffic calendar (hour, day type, season and events)
+      scaled by each road's type and elevation factor
+    - AR(1) demand noise, so fluctuations persist across ticks
+    - weather from a spatially correlated WeatherField advanced in sim time
+    - spillover: congestion above `congestion_threshold` on a road pushes
+      traffic onto the other roads sharing its intersections
+
+    Everything after setup works on per-road arrays, so a tick costs a few
+    vectorized operations regardless of how many roads there are.
+
+    Parameters:
+    - roads, intersections: Network as loaded from the data file
+    - weather_system: WeatherImpact providing condition distributions and impact tables
+    - start_time: Simulated start (default: now)
+    - duration_hours, tick_minutes: Length of the run and of one tick
+    - calendar: TrafficCalendar (default: the shared one)
+    - weather_field: WeatherField to advance (default: a new one seeded from `seed`)
+    - persistence: Tick-to-tick correlation of demand noise (0-1)
+    - variation: Standard deviation of demand noise
+    - spillover: Share of neighbouring excess congestion added to a road
+
+    Yields (time, traffic) with a float32 vector of one value per road.
+    The generator holds only the current state, so callers can stream
+    snapshots into a TrafficHistory or aggregate them incrementally.
+    """
+    start_time = start_time or datetime.now()
+    calendar = calendar or get_traffic_calendar()
+    rng = np.random.default_rng(seed)
+    if weather_field is None:
+        weather_field = WeatherField.for_intersections(weather_system, intersections, seed=rng.integers(2 ** 32))
+
+    # Per-road arrays compiled once for the whole run
+    road_factors = compile_road_factors(roads, intersections).astype(np.float64)
+    route_classes = calendar.compile_route_classes(roads, intersections)
+    road_cells, road_zones = weather_field.locate_roads(roads, intersections)
+    route_codes = weather_system.get_route_type_codes([road.get('type', 'highway') for road in roads])
+    from_index, to_index, degree = compile_road_endpoints(roads, intersections)
+    neighbour_count = np.maximum(degree[from_index] + degree[to_index] - 2, 1)
+    tables = weather_system.get_impact_tables()
+
+    noise = rng.standard_normal(len(roads)) * variation
+    innovation = np.sqrt(1 - persistence * persistence) * variation
+    excess = np.zeros(len(roads))
+
+    num_ticks = int(duration_hours * 60 // tick_minutes)
+    for tick in range(num_ticks):
+        when = start_time + timedelta(minutes=tick * tick_minutes)
+
+        demand = calendar.base_traffic * calendar.tensor[when.month - 1, int(when.weekday() >= 5), when.hour, route_classes]
+        noise = persistence * noise + innovation * rng.standard_normal(len(roads))
+        traffic = np.clip(demand + noise, 0.05, 1.0) * road_factors
+
+        # Congestion from the previous tick spills onto roads sharing an intersection
+        node_excess = np.bincount(from_index, excess, len(degree)) + np.bincount(to_index, excess, len(degree))
+        traffic += spillover * (node_excess[from_index] + node_excess[to_index] - 2 * excess) / neighbour_count
+
+        season_code = tables['seasons'].index(weather_system.get_season_for_month(when.month))
+        index = (weather_field.lookup(road_cells, road_zones, when), road_zones, route_codes, season_code)
+        traffic = np.clip(traffic * tables['multiplier'][index], 0.0, 1.0)
+        traffic[tables['closed'][index]] = 0.0
+
+        excess = np.maximum(traffic - congestion_threshold, 0.0)
+        yield when, traffic.astype(np.float32)
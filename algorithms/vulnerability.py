@@ -0,0 +1,228 @@
+import heapq
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from algorithms.graph_arrays import shortest_path_tree, share_graph, attach_graph
+
+def _preorder(graph, pred_edge, source):
+    # Depth-first preorder of a shortest path tree; a subtree is a contiguous run
+    num_nodes = graph.num_nodes
+    children = [[] for _ in range(num_nodes)]
+    tails = graph.tails
+    for node, edge in enumerate(pred_edge.tolist()):
+        if edge >= 0:
+            children[tails[edge]].append(node)
+
+    preorder, entry, exit_ = [], np.full(num_nodes, -1, dtype=np.int32), np.full(num_nodes, -1, dtype=np.int32)
+    stack = [(source, False)]
+    while stack:
+        node, done = stack.pop()
+        if done:
+            exit_[node] = len(preorder)
+            continue
+        entry[node] = len(preorder)
+        preorder.append(node)
+        stack.append((node, True))
+        stack.extend((child, False) for child in children[node])
+
+    order = np.full(num_nodes, -1, dtype=np.int32)
+    order[:len(preorder)] = preorder
+    return order, entry, exit_
+
+def _base_trees(graph, weights, sources):
+    # Distances and trees for a block of sources, plus the block rows whose tree uses each road
+    shape = (len(sources), graph.num_nodes)
+    roads = graph.edge_data['road']
+    base = {
+        'sources': np.asarray(sources, dtype=np.intp),
+        'dist': np.empty(shape),
+        'pred': np.empty(shape, dtype=np.int32),
+        'preorder': np.empty(shape, dtype=np.int32),
+        'entry': np.empty(shape, dtype=np.int32),
+        'exit': np.empty(shape, dtype=np.int32)
+    }
+    row_lists = [[] for _ in range(int(roads.max()) + 1)]
+    for row, source in enumerate(base['sources'].tolist()):
+        dist, pred_edge, _ = shortest_path_tree(graph, source, weights)
+        base['dist'][row] = dist
+        base['pred'][row] = pred_edge
+        base['preorder'][row], base['entry'][row], base['exit'][row] = _preorder(graph, pred_edge, source)
+        for road in np.unique(roads[pred_edge[pred_edge >= 0]]).tolist():
+            row_lists[road].append(row)
+    return base, row_lists
+
+def _road_edges(graph):
+    # Edge positions of each road (both directions)
+    roads = graph.edge_data['road']
+    edge_order = np.argsort(roads, kind='stable')
+    bounds = np.searchsorted(roads[edge_order], np.arange(int(roads.max()) + 2))
+    return [edge_order[bounds[road]:bounds[road + 1]] for road in range(int(roads.max()) + 1)]
+
+def _reverse_index(graph):
+    # Incoming edge positions per node, as CSR offsets into a position array
+    incoming = np.argsort(graph.heads, kind='stable')
+    indptr = np.zeros(graph.num_nodes + 1, dtype=np.intp)
+    np.cumsum(np.bincount(graph.heads, minlength=graph.num_nodes), out=indptr[1:])
+    return indptr.tolist(), incoming.tolist()
+
+def _repair_distances(graph, reverse, weights, blocked, dist_row, affected):
+    """
+    Shortest distances to the `affected` nodes once `blocked` edges are removed
+
+    Every other node keeps its distance (its tree path avoids the blocked
+    edges), so affected nodes are seeded from their unaffected in-neighbours
+    and a Dijkstra runs inside the affected set only.
+    """
+    indptr, heads, tails = graph._indptr_list, graph._heads_list, graph.tails.tolist()
+    reverse_indptr, incoming = reverse
+    inside = set(affected)
+    new_dist = dict.fromkeys(affected, float('inf'))
+
+    for node in affected:
+        for position in incoming[reverse_indptr[node]:reverse_indptr[node + 1]]:
+            tail = tails[position]
+            if tail not in inside and position not in blocked:
+                candidate = dist_row[tail] + weights[position]
+                if candidate < new_dist[node]:
+                    new_dist[node] = candidate
+
+    heap = [(distance, node) for node, distance in new_dist.items() if distance < float('inf')]
+    heapq.heapify(heap)
+    settled = set()
+    while heap:
+        current_dist, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        for position in range(indptr[node], indptr[node + 1]):
+            head = heads[position]
+            if head in inside and position not in blocked:
+                candidate = current_dist + weights[position]
+                if candidate < new_dist[head]:
+                    new_dist[head] = candidate
+                    heapq.heappush(heap, (candidate, head))
+    return new_dist
+
+def _removal_impact(graph, reverse, weights, base, demand, road_edges, rows):
+    # Extra cost, lost pairs and lost demand when one road's edges are removed, over some block rows
+    blocked = set(road_edges.tolist())
+    extra_cost, disconnected, lost_demand = 0.0, 0, 0.0
+
+    for row in rows:
+        source = int(base['sources'][row])
+        pred, preorder = base['pred'][row], base['preorder'][row]
+        entry, exit_ = base['entry'][row], base['exit'][row]
+        dist_row = base['dist'][row].tolist()
+
+        # Nodes below a removed tree edge, as preorder runs of the tree
+        affected = []
+        for edge in road_edges.tolist():
+            head = graph._heads_list[edge]
+            if pred[head] == edge:
+                affected.extend(preorder[entry[head]:exit_[head]].tolist())
+        if not affected:
+            continue
+
+        new_dist = _repair_distances(graph, reverse, weights, blocked, dist_row, affected)
+        for node, distance in new_dist.items():
+            pair_weight = demand[source][node] if demand is not None else 1.0
+            if distance == float('inf'):
+                disconnected += 1
+                lost_demand += pair_weight
+            else:
+                extra_cost += (distance - dist_row[node]) * pair_weight
+    return extra_cost, disconnected, lost_demand
+
+def _block_impacts(graph, reverse, weights, weight_list, demand, road_edges, sources):
+    # Per-road impact sums and the base travel cost over one block of sources
+    base, row_lists = _base_trees(graph, weights, sources)
+    num_roads = len(road_edges)
+    totals = {
+        'extra_cost': np.zeros(num_roads),
+        'disconnected_pairs': np.zeros(num_roads, dtype=np.int64),
+        'lost_demand': np.zeros(num_roads),
+        'affected_sources': np.array([len(rows) for rows in row_lists], dtype=np.int64)
+    }
+    for road, rows in enumerate(row_lists):
+        if rows:
+            impact = _removal_impact(graph, reverse, weight_list, base, demand, road_edges[road], rows)
+            totals['extra_cost'][road], totals['disconnected_pairs'][road], totals['lost_demand'][road] = impact
+
+    reachable = np.isfinite(base['dist'])
+    pair_weights = np.ones_like(base['dist']) if demand is None else demand[base['sources']]
+    totals['base_cost'] = float(np.sum(base['dist'][reachable] * pair_weights[reachable]))
+    return totals
+
+# Per-process state, attached once by the pool initializer
+_worker = {}
+
+def _init_worker(graph_descriptor):
+    blocks, graph, extras = attach_graph(graph_descriptor)
+    _worker.update(blocks=blocks, graph=graph, extras=extras, reverse=_reverse_index(graph),
+                   weight_list=extras['weights'].tolist(), road_edges=_road_edges(graph))
+
+def _block_impacts_shared(sources):
+    extras = _worker['extras']
+    return _block_impacts(_worker['graph'], _worker['reverse'], extras['weights'], _worker['weight_list'],
+                          extras.get('demand'), _worker['road_edges'], sources)
+
+def road_vulnerability(graph, weights, demand=None, n_workers=1, source_block=64, parallel_threshold=1000):
+    """
+    Impact of removing each road on all-pairs travel cost and connectivity
+
+    Sources are handled in blocks of `source_block`: each block's shortest
+    path trees are built once, recording which roads each tree uses.
+    Removing a road can only lengthen paths from sources whose tree uses
+    one of its edges, and only to nodes below that edge, so just those
+    subtrees are re-solved. Per-road totals from the blocks are added up,
+    so memory grows with the block size rather than with nodes squared.
+    Graphs with more than `parallel_threshold` nodes spread the blocks over
+    a spawned process pool that maps the graph and weights from shared memory.
+
+    Parameters:
+    - graph: CompiledGraph or GraphView with 'road' edge data (e.g. CompiledGraph.from_data)
+    - weights: Per-edge travel cost
+    - demand: Optional (nodes, nodes) OD matrix weighting each pair; every
+      pair counts once if omitted
+    - n_workers: Processes to spread source blocks across
+
+    Returns a dict of per-road arrays: extra_cost (increase in total cost
+    over pairs that stay connected), disconnected_pairs, lost_demand and
+    affected_sources, plus base_cost.
+    """
+    weights = graph.masked_weights(np.asarray(weights, dtype=np.float64))
+    demand = np.asarray(demand, dtype=np.float64) if demand is not None else None
+    sources = graph.active_nodes
+    source_blocks = [sources[i:i + source_block].tolist() for i in range(0, len(sources), source_block)]
+
+    if n_workers > 1 and len(sources) > parallel_threshold:
+        extras = {'weights': weights}
+        if demand is not None:
+            extras['demand'] = demand
+        blocks, descriptor = share_graph(graph, extras)
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(descriptor,)) as pool:
+                partials = list(pool.map(_block_impacts_shared, source_blocks))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    else:
+        reverse, road_edges = _reverse_index(graph), _road_edges(graph)
+        weight_list = weights.tolist()
+        partials = [
+            _block_impacts(graph, reverse, weights, weight_list, demand, road_edges, block_sources)
+            for block_sources in source_blocks
+        ]
+
+    totals = partials[0]
+    for partial in partials[1:]:
+        for key in totals:
+            totals[key] = totals[key] + partial[key]
+    return totals
+
+def rank_roads(vulnerability, top_n=None):
+    """Road indices ordered by disconnected pairs, then by extra cost (most critical first)"""
+    order = np.lexsort((-vulnerability['extra_cost'], -vulnerability['disconnected_pairs']))
+    return order[:top_n] if top_n else order
@@ -0,0 +1,118 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+def _run_shard(seed_seq, n_scenarios, batch_size, hour_cdfs, multiplier, closed, closure_conditions,
+               zones, route_codes, base_traffic, traffic_spread, congestion_threshold):
+    """Run one shard of scenarios and return per-road counts"""
+    rng = np.random.default_rng(seed_seq)
+    num_roads = len(base_traffic)
+    closure_counts = np.zeros(num_roads, dtype=np.int64)
+    congestion_counts = np.zeros(num_roads, dtype=np.int64)
+    traffic_sum = np.zeros(num_roads)
+
+    # All (hour, zone) CDFs in one increasing array: group g's entries are
+    # offset by g, so one searchsorted of g + u samples every road at once
+    num_hours, num_zones, num_conditions = hour_cdfs.shape
+    offsets = np.arange(num_hours * num_zones, dtype=np.float64)
+    flat_cdf = (hour_cdfs.reshape(-1, num_conditions) + offsets[:, None]).ravel()
+
+    # Flatten (condition, zone, route type) so each lookup is a 1-D take
+    road_keys = zones * multiplier.shape[2] + route_codes
+    stride = multiplier.shape[1] * multiplier.shape[2]
+    multiplier = multiplier.ravel().astype(np.float32)
+    closed = (closed | closure_conditions[:, None, None]).ravel()
+    base_traffic = base_traffic.astype(np.float32)
+
+    done = 0
+    while done < n_scenarios:
+        batch = min(batch_size, n_scenarios - done)
+
+        # Each scenario picks an hour; each road then draws its condition
+        hours = rng.integers(0, num_hours, size=batch)
+        groups = hours[:, None] * num_zones + zones[None, :]
+        positions = np.searchsorted(flat_cdf, groups + rng.random((batch, num_roads)), side='right')
+        codes = positions - groups * num_conditions
+
+        keys = codes * stride + road_keys
+
+        # Log-normal demand uncertainty around the base traffic
+        demand = np.exp(rng.standard_normal((batch, num_roads), dtype=np.float32) * np.float32(traffic_spread))
+        demand *= base_traffic
+        traffic = np.minimum(demand * multiplier.take(keys), 1.0)
+
+        is_closed = closed.take(keys)
+        traffic[is_closed] = 0.0
+        closure_counts += is_closed.sum(axis=0)
+        congestion_counts += ((traffic >= congestion_threshold) & ~is_closed).sum(axis=0)
+        traffic_sum += traffic.sum(axis=0)
+        done += batch
+
+    return closure_counts, congestion_counts, traffic_sum
+
+def run_weather_ensemble(weather_system, base_traffic, elevations, route_types, season,
+                         n_scenarios=10000, hours=None, batch_size=500, n_workers=1, seed=None,
+                         congestion_threshold=0.7, traffic_spread=0.1, closure_conditions=('Road Blockage',)):
+    """
+    Monte Carlo weather and traffic ensemble for network-wide risk
+
+    Runs `n_scenarios` draws from the WeatherImpact season/zone condition
+    distributions in vectorized batches, optionally sharded across a process
+    pool with independent seeded RNG streams.
+
+    Parameters:
+    - weather_system: WeatherImpact instance
+    - base_traffic, elevations, route_types: Per-road arrays (route types as in apply_weather_impact)
+    - season: Season name, e.g. 'Monsoon'
+    - hours: Hours of day scenarios are drawn from (default: all 24)
+    - n_workers: Processes to shard scenarios across (1 runs in-process)
+    - congestion_threshold: Traffic level counted as congested
+    - traffic_spread: Log-normal sigma of demand around base traffic
+    - closure_conditions: Conditions that count as an effective closure
+
+    Returns a dict of per-road arrays: closure_probability,
+    congestion_probability and expected_traffic, plus n_scenarios.
+    """
+    tables = weather_system.get_impact_tables()
+    season_code = tables['seasons'].index(season)
+    hours = list(range(24)) if hours is None else list(hours)
+
+    # Per-hour cumulative condition distributions, shape (hours, zones, conditions)
+    hour_cdfs = np.cumsum([weather_system.get_condition_distribution(season, hour) for hour in hours], axis=2)
+    hour_cdfs[:, :, -1] = 1.0
+
+    shard_args = (
+        hour_cdfs,
+        tables['multiplier'][:, :, :, season_code],
+        tables['closed'][:, :, :, season_code],
+        np.isin(tables['conditions'], list(closure_conditions)),
+        weather_system.get_elevation_zones(elevations),
+        weather_system.get_route_type_codes(route_types),
+        np.asarray(base_traffic, dtype=np.float64),
+        traffic_spread,
+        congestion_threshold
+    )
+
+    n_workers = max(1, min(n_workers, n_scenarios))
+    shard_sizes = [n_scenarios // n_workers + (i < n_scenarios % n_workers) for i in range(n_workers)]
+    seeds = np.random.SeedSequence(seed).spawn(n_workers)
+
+    if n_workers == 1:
+        results = [_run_shard(seeds[0], shard_sizes[0], batch_size, *shard_args)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [
+                pool.submit(_run_shard, seed_seq, size, batch_size, *shard_args)
+                for seed_seq, size in zip(seeds, shard_sizes)
+            ]
+            results = [future.result() for future in futures]
+
+    closure_counts = sum(result[0] for result in results)
+    congestion_counts = sum(result[1] for result in results)
+    traffic_sum = sum(result[2] for result in results)
+
+    return {
+        'closure_probability': closure_counts / n_scenarios,
+        'congestion_probability': congestion_counts / n_scenarios,
+        'expected_traffic': traffic_sum / n_scenarios,
+        'n_scenarios': n_scenarios
+    }
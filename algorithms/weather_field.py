@@ -0,0 +1,131 @@
+import math
+import threading
+import numpy as np
+from datetime import datetime
+
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+def _smoothing_kernel(correlation_cells):
+    """1-D Gaussian kernel normalised so the smoothed field keeps unit variance"""
+    radius = max(1, int(math.ceil(2 * correlation_cells)))
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (offsets / max(correlation_cells, 1e-6)) ** 2)
+    return kernel / np.sqrt(np.sum(kernel ** 2))
+
+class WeatherField:
+    """
+    Spatially and temporally correlated weather over a lat/lon grid
+
+    Each tick draws one latent Gaussian field over the grid (smoothed so
+    neighbouring cells are similar, and AR(1)-blended with the previous
+    tick so weather persists). The latent value is mapped through each
+    elevation band's condition distribution, ordered from mildest to most
+    severe impact, giving one condition per (band, cell). Roads look their
+    condition up by index, so a tick costs O(cells) random draws instead
+    of O(roads), and neighbouring roads see consistent weather.
+
+    Parameters:
+    - weather_system: WeatherImpact providing the condition distributions
+    - bounds: (lat_min, lat_max, lon_min, lon_max)
+    - cell_size: Grid cell size in degrees
+    - correlation_cells: Spatial correlation length in cells
+    - persistence: Correlation between consecutive ticks (0-1)
+    - tick_minutes: Field is resampled at most once per tick
+    """
+
+    def __init__(self, weather_system, bounds, cell_size=0.1, correlation_cells=2.0,
+                 persistence=0.8, tick_minutes=10, seed=None):
+        self.weather_system = weather_system
+        self.lat_min, self.lat_max, self.lon_min, self.lon_max = bounds
+        self.cell_size = cell_size
+        self.ny = max(1, int(math.ceil((self.lat_max - self.lat_min) / cell_size)))
+        self.nx = max(1, int(math.ceil((self.lon_max - self.lon_min) / cell_size)))
+        self.kernel = _smoothing_kernel(correlation_cells)
+        self.persistence = persistence
+        self.tick_minutes = tick_minutes
+        self.rng = np.random.default_rng(seed)
+
+        self.latent = None
+        self.codes = None
+        self.tick = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_intersections(cls, weather_system, intersections, padding=0.1, **kwargs):
+        """Field covering all intersection positions"""
+        lats = [node['pos'][0] for node in intersections.values()]
+        lons = [node['pos'][1] for node in intersections.values()]
+        bounds = (min(lats) - padding, max(lats) + padding, min(lons) - padding, max(lons) + padding)
+        return cls(weather_system, bounds, **kwargs)
+
+    @property
+    def num_cells(self):
+        return self.ny * self.nx
+
+    def cell_index(self, lats, lons):
+        """Flat cell index for each coordinate (clamped to the grid)"""
+        rows = np.clip(((np.asarray(lats) - self.lat_min) / self.cell_size).astype(int), 0, self.ny - 1)
+        cols = np.clip(((np.asarray(lons) - self.lon_min) / self.cell_size).astype(int), 0, self.nx - 1)
+        return rows * self.nx + cols
+
+    def locate_roads(self, roads, intersections):
+        """
+        (cells, zones) index arrays for roads
+
+        A road uses the cell of its midpoint and the elevation zone of its
+        higher endpoint. Compute once per network and reuse every tick.
+        """
+        start = np.array([intersections[road['from']]['pos'] for road in roads], dtype=np.float64)
+        end = np.array([intersections[road['to']]['pos'] for road in roads], dtype=np.float64)
+        middle = (start + end) / 2
+        elevations = [
+            max(intersections[road['from']].get('elevation', 1000), intersections[road['to']].get('elevation', 1000))
+            for road in roads
+        ]
+        return self.cell_index(middle[:, 0], middle[:, 1]), self.weather_system.get_elevation_zones(elevations)
+
+    def _smooth(self, noise):
+        # Separable Gaussian blur along both grid axes
+        smooth = np.apply_along_axis(np.convolve, 0, noise, self.kernel, mode='same')
+        return np.apply_along_axis(np.convolve, 1, smooth, self.kernel, mode='same')
+
+    def _tick_of(self, when):
+        return int(when.timestamp() // (self.tick_minutes * 60))
+
+    def advance(self, when=None):
+        """Sample the field for the tick containing `when`"""
+        when = when or datetime.now()
+        tick = self._tick_of(when)
+
+        fresh = self._smooth(self.rng.standard_normal((self.ny, self.nx)))
+        if self.latent is None or self.tick is None:
+            self.latent = fresh
+        else:
+            # AR(1) over however many ticks have passed keeps unit variance
+            rho = self.persistence ** max(1, tick - self.tick)
+            self.latent = rho * self.latent + math.sqrt(1 - rho * rho) * fresh
+
+        # Uniform quantile per cell, then mildest-to-most-severe inverse CDF per band
+        uniform = (0.5 * (1 + _erf(self.latent.ravel() / math.sqrt(2)))).astype(np.float64)
+        season = self.weather_system.get_season_for_month(when.month)
+        distribution = self.weather_system.get_condition_distribution(season, when.hour)
+        impacts = [data['impact'] for data in self.weather_system.weather_conditions.values()]
+        severity_order = np.argsort(impacts, kind='stable')
+        cdf = np.cumsum(distribution[:, severity_order], axis=1)
+        cdf[:, -1] = 1.0
+        ranks = (uniform[None, :, None] >= cdf[:, None, :]).sum(axis=2)
+        self.codes = severity_order[ranks]
+        self.tick = tick
+        return self.codes
+
+    def get(self, when=None):
+        """(zones, cells) condition codes for the current tick, sampled once per tick"""
+        when = when or datetime.now()
+        with self._lock:
+            if self.codes is None or self._tick_of(when) != self.tick:
+                self.advance(when)
+            return self.codes
+
+    def lookup(self, cells, zones, when=None):
+        """Condition code for each (cell, zone) pair, e.g. from locate_roads"""
+        return self.get(when)[zones, cells]
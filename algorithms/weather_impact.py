@@ -1,6 +1,10 @@
 import random
+import numpy as np
 from datetime import datetime
 
+# Config dicts the impact tables are compiled from
+CONFIG_ATTRIBUTES = ('weather_conditions', 'seasons', 'elevation_zones', 'zone_sensitivity', 'special_routes')
+
 class WeatherImpact:
     def __init__(self):
         self.weather_conditions = {
@@ -128,6 +132,14 @@ class WeatherImpact:
             'very_high': (3000, float('inf'))  # Tethys Himalayan Zone
         }
         
+        # Extra sensitivity multiplier per elevation zone
+        self.zone_sensitivity = {
+            'low': 1.0,
+            'medium': 1.0,
+            'high': 1.2,
+            'very_high': 1.5
+        }
+        
         # Special route conditions
         self.special_routes = {
             'char_dham': {
@@ -154,20 +166,23 @@ class WeatherImpact:
                 return zone
         return 'very_high'
 
-    def get_current_season(self):
-        """Get current season based on month"""
-        current_month = datetime.now().month
+    def get_season_for_month(self, month):
+        """Get season for a month number (1-12)"""
         for season, data in self.seasons.items():
-            if current_month in data['months']:
+            if month in data['months']:
                 return season
         return 'Summer'  # Default season
 
-    def get_current_weather(self, elevation_zone):
-        """Get weather based on season, time, and elevation zone"""
-        season = self.get_current_season()
-        hour = datetime.now().hour
+    def get_current_season(self):
+        """Get current season based on month"""
+        return self.get_season_for_month(datetime.now().month)
+
+    def get_possible_conditions(self, season, hour, elevation_zone):
+        """
+        Candidate conditions for a season, hour and elevation zone
         
-        # Get conditions for the specific elevation zone
+        Repeated entries make a condition more likely; sampling picks one uniformly.
+        """
         possible_conditions = self.seasons[season]['conditions'][elevation_zone]
         
         # Time-based modifications
@@ -181,16 +196,173 @@ class WeatherImpact:
             if elevation_zone in ['medium', 'high', 'very_high']:
                 possible_conditions = ['Mountain Fog'] * 3 + possible_conditions
         
+        return possible_conditions
+
+    def get_current_weather(self, elevation_zone):
+        """Get weather based on season, time, and elevation zone"""
+        season = self.get_current_season()
+        hour = datetime.now().hour
+        
+        # Get conditions for the specific elevation zone
+        possible_conditions = self.get_possible_conditions(season, hour, elevation_zone)
+        
         weather = random.choice(possible_conditions)
+        return self.describe_condition(weather, season)
+
+    def describe_condition(self, condition, season):
+        """Weather dict for a condition, as returned by get_current_weather"""
         return {
-            'condition': weather,
-            'icon': self.weather_conditions[weather]['icon'],
-            'impact': self.weather_conditions[weather]['impact'],
-            'description': self.weather_conditions[weather]['description'],
-            'elevation_sensitivity': self.weather_conditions[weather]['elevation_sensitivity'],
+            'condition': condition,
+            'icon': self.weather_conditions[condition]['icon'],
+            'impact': self.weather_conditions[condition]['impact'],
+            'description': self.weather_conditions[condition]['description'],
+            'elevation_sensitivity': self.weather_conditions[condition]['elevation_sensitivity'],
             'season': season
         }
 
+    @property
+    def condition_names(self):
+        """Condition names in code order for the batch API"""
+        return list(self.weather_conditions.keys())
+
+    @property
+    def zone_names(self):
+        """Elevation zone names ordered from lowest to highest"""
+        return sorted(self.elevation_zones, key=lambda zone: self.elevation_zones[zone][0])
+
+    def get_elevation_zones(self, elevations):
+        """Vectorized get_elevation_zone: zone index (into zone_names) per elevation"""
+        zone_names = self.zone_names
+        bins = [self.elevation_zones[zone][0] for zone in zone_names[1:]]
+        return np.digitize(np.asarray(elevations, dtype=np.float64), bins)
+
+    def get_condition_distribution(self, season, hour):
+        """Probability of each condition (columns) per elevation zone (rows)"""
+        condition_index = {name: i for i, name in enumerate(self.condition_names)}
+        zone_names = self.zone_names
+        probabilities = np.zeros((len(zone_names), len(condition_index)))
+        for z, zone in enumerate(zone_names):
+            possible_conditions = self.get_possible_conditions(season, hour, zone)
+            for condition in possible_conditions:
+                probabilities[z, condition_index[condition]] += 1.0 / len(possible_conditions)
+        return probabilities
+
+    def sample_conditions(self, zones, season, hour, rng=None):
+        """Draw one condition code per entry of `zones` with a single vectorized sampler"""
+        rng = rng if rng is not None else np.random.default_rng()
+        cdf = np.cumsum(self.get_condition_distribution(season, hour), axis=1)
+        cdf[:, -1] = 1.0
+        u = rng.random(len(zones))
+        return (u[:, None] >= cdf[zones]).sum(axis=1)
+
+    def __setattr__(self, name, value):
+        # Replacing a config dict drops the compiled impact tables
+        if name in CONFIG_ATTRIBUTES:
+            self.__dict__['_impact_tables'] = None
+        super().__setattr__(name, value)
+
+    def invalidate_impact_tables(self):
+        """Drop the compiled impact tables after editing a config dict in place"""
+        self._impact_tables = None
+
+    def get_impact_tables(self):
+        """
+        Dense impact tables compiled from the config dicts
+        
+        Returns a dict with:
+        - multiplier: float array indexed (condition, elevation_zone, route_type, season)
+        - closed: bool array with the same indexing, True where the route is closed
+        - conditions, zones, route_types, seasons: labels for each axis
+          (the last route type, None, covers all other roads)
+        
+        Tables are compiled on first use and kept until a config dict is
+        replaced or invalidate_impact_tables() is called.
+        """
+        if self._impact_tables is not None:
+            return self._impact_tables
+        
+        conditions = self.condition_names
+        zones = self.zone_names
+        route_types = list(self.special_routes.keys()) + [None]
+        seasons = list(self.seasons.keys())
+        
+        multiplier = np.ones((len(conditions), len(zones), len(route_types), len(seasons)))
+        closed = np.zeros(multiplier.shape, dtype=bool)
+        
+        for c, condition in enumerate(conditions):
+            impact = self.weather_conditions[condition]['impact']
+            sensitivity = self.weather_conditions[condition]['elevation_sensitivity']
+            for z, zone in enumerate(zones):
+                elevation_factor = sensitivity * self.zone_sensitivity.get(zone, 1.0)
+                for r, route_type in enumerate(route_types):
+                    route_data = self.special_routes.get(route_type)
+                    for s, season in enumerate(seasons):
+                        route_factor = 1.0
+                        if route_data is not None:
+                            route_factor = route_data['risk_factor']
+                            if season == 'Monsoon':
+                                route_factor *= route_data['monsoon_risk']
+                            closed[c, z, r, s] = season in route_data['seasonal_closure']
+                        multiplier[c, z, r, s] = impact * elevation_factor * route_factor
+        
+        self._impact_tables = {
+            'multiplier': multiplier,
+            'closed': closed,
+            'conditions': conditions,
+            'zones': zones,
+            'route_types': route_types,
+            'seasons': seasons
+        }
+        return self._impact_tables
+
+    def get_route_type_codes(self, route_types):
+        """Route type axis index for each entry; anything not special maps to the last slot"""
+        lookup = {route_type: i for i, route_type in enumerate(self.special_routes)}
+        other = len(lookup)
+        return np.array([lookup.get(route_type, other) for route_type in route_types], dtype=np.intp)
+
+    def apply_weather_impact_batch(self, base_traffic, elevations, route_types=None, when=None, rng=None,
+                                   condition_codes=None):
+        """
+        Vectorized apply_weather_impact over many roads at once
+        
+        Parameters:
+        - base_traffic: Array of base traffic values
+        - elevations: Array of elevations in meters (same length)
+        - route_types: Optional sequence of route types ('char_dham', 'pilgrimage', 'tourist', None)
+          or precomputed codes from get_route_type_codes
+        - when: Datetime used for season and hour (default: now)
+        - rng: Optional numpy Generator
+        - condition_codes: Optional precomputed conditions (e.g. from a WeatherField);
+          sampled independently per road if omitted
+        
+        Returns (traffic, condition_codes); codes index into condition_names.
+        Roads closed for the season get traffic 0.0.
+        """
+        when = when or datetime.now()
+        season = self.get_season_for_month(when.month)
+        base_traffic = np.asarray(base_traffic, dtype=np.float64)
+        tables = self.get_impact_tables()
+        
+        zones = self.get_elevation_zones(elevations)
+        if condition_codes is None:
+            codes = self.sample_conditions(zones, season, when.hour, rng)
+        else:
+            codes = np.asarray(condition_codes)
+        
+        if route_types is None:
+            route_codes = len(tables['route_types']) - 1
+        elif np.asarray(route_types).dtype.kind in 'iu':
+            route_codes = np.asarray(route_types)
+        else:
+            route_codes = self.get_route_type_codes(route_types)
+        season_code = tables['seasons'].index(season)
+        
+        # One gather for the multiplier, one for closures
+        traffic = np.minimum(base_traffic * tables['multiplier'][codes, zones, route_codes, season_code], 1.0)
+        traffic[tables['closed'][codes, zones, route_codes, season_code]] = 0.0
+        return traffic, codes
+
     def apply_weather_impact(self, base_traffic, elevation, route_type=None):
         """
         Apply weather impact to traffic considering elevation and route type
@@ -203,35 +375,21 @@ class WeatherImpact:
         elevation_zone = self.get_elevation_zone(elevation)
         weather = self.get_current_weather(elevation_zone)
         season = self.get_current_season()
+        tables = self.get_impact_tables()
         
-        # Base weather impact
-        impact = weather['impact']
-        
-        # Elevation sensitivity
-        elevation_factor = weather['elevation_sensitivity']
-        if elevation_zone == 'high':
-            elevation_factor *= 1.2
-        elif elevation_zone == 'very_high':
-            elevation_factor *= 1.5
-        
-        # Route type impact
-        route_factor = 1.0
-        if route_type in self.special_routes:
-            route_data = self.special_routes[route_type]
-            route_factor = route_data['risk_factor']
-            
-            # Check seasonal closure
-            if season in route_data['seasonal_closure']:
-                return 0.0, {**weather, 'description': 'Route closed for season'}
-            
-            # Apply monsoon risk for special routes
-            if season == 'Monsoon':
-                route_factor *= route_data['monsoon_risk']
+        # Weather impact, elevation sensitivity and route risk from the compiled table
+        index = (
+            tables['conditions'].index(weather['condition']),
+            tables['zones'].index(elevation_zone),
+            self.get_route_type_codes([route_type])[0],
+            tables['seasons'].index(season)
+        )
         
-        # Calculate final impact
-        total_impact = impact * elevation_factor * route_factor
+        # Check seasonal closure
+        if tables['closed'][index]:
+            return 0.0, {**weather, 'description': 'Route closed for season'}
         
         # Calculate final traffic value (capped at 1.0)
-        final_traffic = min(base_traffic * total_impact, 1.0)
+        final_traffic = min(base_traffic * tables['multiplier'][index], 1.0)
         
-        return final_traffic, weather 
\ No newline at end of file
+        return final_traffic, weather
@@ -3,14 +3,16 @@ import networkx as nx
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import time, json, random, os, io, base64
-from datetime import datetime
+import time, json, os, io, base64
+from datetime import datetime, timedelta
 from PIL import Image
 import folium
+from folium.plugins import FastMarkerCluster
 from streamlit_folium import st_folium
 import plotly.graph_objects as go
 import plotly.express as px
 from matplotlib import cm
+from matplotlib.collections import LineCollection
 import matplotlib.animation as animation
 from matplotlib.animation import FuncAnimation
 
@@ -18,8 +20,21 @@ from matplotlib.animation import FuncAnimation
 from algorithms.dijkstra import dijkstra_algorithm
 from algorithms.astar import astar_algorithm
 from algorithms.bellman_ford import bellman_ford_algorithm
-from algorithms.traffic_prediction import get_future_traffic_predictions, get_road_specific_prediction
+from algorithms.reliability_routing import edge_time_moments, reliability_route
+from algorithms.hierarchical_routing import DivisionRouter
+from algorithms.traffic_prediction import get_road_specific_prediction
 from algorithms.weather_impact import WeatherImpact
+from algorithms.weather_field import WeatherField
+from algorithms.weather_ensemble import run_weather_ensemble
+from algorithms.search_index import NodeSearchIndex
+from algorithms.prediction_cache import get_cached_future_predictions, get_cached_traffic_matrix
+from algorithms.traffic_history import TrafficHistory
+from algorithms.graph_arrays import CompiledGraph, GraphView
+from algorithms.centrality import CentralityService
+from algorithms.vulnerability import road_vulnerability, rank_roads
+from algorithms.traffic_assignment import gravity_demand, frank_wolfe_assignment
+from algorithms.map_export import DEFAULT_EXPORT_DIR, DETAIL_LEVELS, TRAFFIC_CLASS_BOUNDS, write_traffic_delta
+from algorithms.traffic_simulation import ROAD_CONDITIONS, compile_road_arrays, simulate_step, sample_road_attributes, run_simulation
 
 # Page configuration and simplified CSS
 st.set_page_config(page_title="Uttarakhand Traffic Flow Optimizer", page_icon="🏔️", layout="wide")
@@ -492,6 +507,188 @@ def load_sample_data():
         st.error("Required data file not found: data/uttarakhand_realistic_data.json. Please ensure this file exists in the data/ directory.")
         st.stop()
 
+def get_dataset_version():
+    """Version string for the data file, used to key caches built from it"""
+    try:
+        return str(os.path.getmtime('data/uttarakhand_realistic_data.json'))
+    except OSError:
+        return '0'
+
+@st.cache_resource
+def get_search_index(dataset_version):
+    """Build the intersection search index once per dataset version"""
+    return NodeSearchIndex(load_sample_data()["intersections"])
+
+def node_search_box(label, search_index, key, default=None, limit=20, help=None):
+    """Typeahead intersection picker that only sends the top matches to the browser"""
+    query = st.text_input(
+        f"{label} search",
+        key=f"{key}_query",
+        placeholder="Type a name or ID (e.g. Kedarnath, DEH)",
+        label_visibility="collapsed"
+    )
+    matches = search_index.search(query, limit=limit, default=default)
+    if not matches:
+        st.warning(f"No intersections match '{query}'")
+        return None
+    return st.selectbox(
+        label,
+        matches,
+        format_func=search_index.label,
+        key=key,
+        help=help
+    )
+
+@st.cache_resource
+def get_traffic_history(num_roads):
+    """Open (or create) the on-disk traffic history shared by all sessions"""
+    try:
+        return TrafficHistory('data/traffic_history', num_roads=num_roads, capacity=60 * 24 * 30)
+    except ValueError:
+        # History was recorded for a different road network
+        return None
+
+def record_traffic_snapshot(history, data):
+    """Append the current road traffic to the history, at most once per minute"""
+    if history is None:
+        return
+    now = datetime.now()
+    last = history.last_timestamp()
+    if last is None or last < now.replace(second=0, microsecond=0):
+        history.append([road["traffic"] for road in data["roads"]], now)
+
+def publish_map_traffic(data):
+    """Refresh the static map export's traffic delta (see algorithms/map_export.py), at most once per minute"""
+    if not os.path.exists(os.path.join(DEFAULT_EXPORT_DIR, 'traffic.json')):
+        return
+    try:
+        # Serialized across sessions by the export's lock file
+        write_traffic_delta(data, DEFAULT_EXPORT_DIR, min_interval=60)
+    except ValueError:
+        # Export was written for a different road network; re-run the export
+        pass
+
+@st.cache_resource
+def get_weather_field(dataset_version):
+    """Weather field over the network, shared by all sessions and resampled once per tick"""
+    data = load_sample_data()
+    weather_field = WeatherField.for_intersections(WeatherImpact(), data["intersections"])
+    road_cells, road_zones = weather_field.locate_roads(data["roads"], data["intersections"])
+    return weather_field, road_cells, road_zones
+
+@st.cache_data
+def get_simulated_outlook(dataset_version, duration_hours, tick_minutes, start_time):
+    """
+    Run the tick simulation and average its snapshots per hour
+    
+    Snapshots are folded into hourly means as they are produced, so only
+    one hour of state is held at a time. Returns (hour_times, matrix of
+    shape (roads, hours), number of ticks, seconds taken).
+    """
+    data = load_sample_data()
+    started = time.time()
+    hour_times, hourly, ticks = [], [], 0
+    hour_sum, hour_count = None, 0
+    for when, traffic in run_simulation(data["roads"], data["intersections"], WeatherImpact(),
+                                        start_time=start_time, duration_hours=duration_hours,
+                                        tick_minutes=tick_minutes, seed=0):
+        hour_start = when.replace(minute=0, second=0, microsecond=0)
+        if not hour_times or hour_times[-1] != hour_start:
+            if hour_sum is not None:
+                hourly.append(hour_sum / hour_count)
+            hour_times.append(hour_start)
+            hour_sum, hour_count = np.zeros(len(traffic)), 0
+        hour_sum += traffic
+        hour_count += 1
+        ticks += 1
+    hourly.append(hour_sum / hour_count)
+    return hour_times, np.array(hourly, dtype=np.float32).T, ticks, time.time() - started
+
+@st.cache_data
+def get_equilibrium_assignment(dataset_version, total_trips):
+    """User-equilibrium road flows for gravity-model demand, per road (busier direction)"""
+    data = load_sample_data()
+    graph = CompiledGraph.from_data(data)
+    zones, demand = gravity_demand(graph, total_trips=total_trips)
+    result = frank_wolfe_assignment(graph, demand, zones)
+    
+    # Both directions of a road share its lanes; report the busier one
+    volume_capacity = np.zeros(len(data["roads"]))
+    flows = np.zeros(len(data["roads"]))
+    np.maximum.at(volume_capacity, graph.edge_data['road'], result['volume_capacity'])
+    np.maximum.at(flows, graph.edge_data['road'], result['flows'])
+    return flows, volume_capacity, result['iterations'], result['relative_gap']
+
+@st.cache_data
+def get_road_vulnerability(dataset_version):
+    """Impact of each single road closure on all-pairs travel cost (distance weighted by traffic)"""
+    graph = CompiledGraph.from_data(load_sample_data())
+    weights = graph.edge_data['distance'] * (1 + graph.edge_data['traffic'] * 2)
+    return road_vulnerability(graph, weights, n_workers=os.cpu_count() or 1)
+
+@st.cache_resource
+def get_division_router(dataset_version, consider_traffic):
+    """Division boundary tables shared by all sessions, one router per weighting; refreshed per query from the current weights"""
+    return DivisionRouter.from_networkx(create_graph_from_data(load_sample_data(), consider_traffic))
+
+@st.cache_resource
+def get_compiled_network(dataset_version):
+    """CSR form of the network, compiled once per dataset version; filters only add GraphView masks"""
+    return CompiledGraph.from_networkx(create_graph_from_data(load_sample_data()))
+
+def with_current_weights(network, G):
+    """The compiled network sharing its CSR arrays, with edge weights and traffic read from G (the traffic on screen)"""
+    edges = [G[network.nodes[u]][network.nodes[v]] for u, v in zip(network.tails.tolist(), network._heads_list)]
+    edge_data = dict(network.edge_data)
+    edge_data['weight'] = np.array([edge['weight'] for edge in edges], dtype=np.float64)
+    edge_data['traffic'] = np.array([edge['traffic'] for edge in edges], dtype=np.float64)
+    return CompiledGraph.from_csr(network.nodes, network.indptr, network.tails, network.heads, edge_data, network.node_data)
+
+@st.cache_resource
+def get_centrality_service():
+    """Centrality cache shared by all sessions; results are keyed by dataset version, filters and traffic"""
+    return CentralityService(n_workers=os.cpu_count() or 1)
+
+@st.cache_resource
+def get_road_arrays(dataset_version):
+    """Per-road attribute arrays for the vectorized simulation step"""
+    data = load_sample_data()
+    weather_field = get_weather_field(dataset_version)[0]
+    return compile_road_arrays(data["roads"], data["intersections"], weather_field.weather_system)
+
+def get_road_route_types(data):
+    """Special route type of each road from its endpoints ('char_dham', 'pilgrimage', 'tourist' or None)"""
+    route_types = []
+    for road in data["roads"]:
+        endpoint_types = {data["intersections"][road["from"]].get("type"), data["intersections"][road["to"]].get("type")}
+        route_types.append(next((t for t in ['char_dham', 'pilgrimage', 'tourist'] if t in endpoint_types), None))
+    return route_types
+
+@st.cache_data
+def get_closure_risk(dataset_version, season, n_scenarios=10000):
+    """Monte Carlo closure and congestion probabilities per road for a season"""
+    data = load_sample_data()
+    intersections = data["intersections"]
+    elevations = [
+        max(intersections[road["from"]].get("elevation", 1000), intersections[road["to"]].get("elevation", 1000))
+        for road in data["roads"]
+    ]
+    return run_weather_ensemble(
+        WeatherImpact(),
+        [road["traffic"] for road in data["roads"]],
+        elevations,
+        get_road_route_types(data),
+        season,
+        n_scenarios=n_scenarios,
+        seed=0
+    )
+
+@st.cache_data
+def get_edge_time_moments(dataset_version, season):
+    """Per-edge travel time mean and variance from sampled weather and traffic scenarios"""
+    G = create_graph_from_data(load_sample_data())
+    return edge_time_moments(G, WeatherImpact(), season, n_samples=1000, seed=0)
+
 def create_graph_from_data(data, consider_traffic=True):
     """Create a NetworkX graph from the data"""
     G = nx.DiGraph()
@@ -528,47 +725,94 @@ def create_graph_from_data(data, consider_traffic=True):
     
     return G
 
-def visualize_graph(G, path=None, title="Uttarakhand Traffic Network", step=None):
-    """Create a network visualization of the traffic graph, optionally animating the route step-by-step."""
-    plt.figure(figsize=(12, 8))
+NODE_TYPE_COLORS = {
+    'capital': '#2E7D32',
+    'char_dham': '#C62828',
+    'pilgrimage': '#AD1457',
+    'tourist': '#1565C0',
+    'town': '#F57C00',
+    'city': '#6A1B9A'
+}
+NETWORK_FIGSIZE = (12, 8)
+NETWORK_AXES_RECT = [0.0, 0.0, 1.0, 0.94]  # Leaves room for the title above the map
+NETWORK_DPI = 120  # Base layer and displayed frames share one resolution, so no resampling
+
+def render_network_base_layer(G):
+    """
+    Render the static part of the network plot (all nodes and their labels) to an RGBA image
+
+    Returns (image, extent) where extent is the (xmin, xmax, ymin, ymax)
+    data range the image covers, for drawing it back with imshow.
+    """
     pos = nx.get_node_attributes(G, 'pos')
     node_types = nx.get_node_attributes(G, 'type')
-    node_colors = {
-        'capital': '#2E7D32',
-        'char_dham': '#C62828',
-        'pilgrimage': '#AD1457',
-        'tourist': '#1565C0',
-        'town': '#F57C00',
-        'city': '#6A1B9A'
-    }
+    xs, ys = zip(*pos.values())
+    x_margin = (max(xs) - min(xs)) * 0.05 or 1.0
+    y_margin = (max(ys) - min(ys)) * 0.05 or 1.0
+    extent = (min(xs) - x_margin, max(xs) + x_margin, min(ys) - y_margin, max(ys) + y_margin)
+    
+    fig = plt.figure(figsize=NETWORK_FIGSIZE, dpi=NETWORK_DPI)
+    ax = fig.add_axes([0.0, 0.0, 1.0, 1.0])
     # Draw all nodes lightly
     for node_type in set(node_types.values()):
         node_list = [node for node in G.nodes() if node_types.get(node) == node_type]
         if node_list:
-            nx.draw_networkx_nodes(G, pos, nodelist=node_list, node_color=node_colors.get(node_type, '#666666'), node_size=700, alpha=0.2)
+            nx.draw_networkx_nodes(G, pos, nodelist=node_list, node_color=NODE_TYPE_COLORS.get(node_type, '#666666'), node_size=700, alpha=0.2, ax=ax)
+    labels = {node: G.nodes[node].get('name', node) for node in G.nodes()}
+    nx.draw_networkx_labels(G, pos, labels, font_size=8, ax=ax)
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    ax.axis('off')
+    
+    # The image must fill exactly the axes area of the overlay figure
+    width, height = NETWORK_FIGSIZE
+    fig.set_size_inches(width * NETWORK_AXES_RECT[2], height * NETWORK_AXES_RECT[3])
+    fig.canvas.draw()
+    image = np.asarray(fig.canvas.buffer_rgba()).copy()
+    plt.close(fig)
+    return image, extent
+
+@st.cache_resource
+def get_network_base_layer(dataset_version):
+    """Base layer image of the network plot, rendered once per dataset version"""
+    return render_network_base_layer(create_graph_from_data(load_sample_data()))
+
+def visualize_graph(G, path=None, title="Uttarakhand Traffic Network", step=None, base_layer=None):
+    """
+    Create a network visualization of the traffic graph, optionally animating the route step-by-step.
+    
+    Nodes and labels come from a pre-rendered base layer (see get_network_base_layer),
+    so each call only draws the route overlay. Close the returned figure once displayed.
+    """
+    image, extent = base_layer if base_layer is not None else render_network_base_layer(G)
+    fig = plt.figure(figsize=NETWORK_FIGSIZE)
+    ax = fig.add_axes(NETWORK_AXES_RECT)
+    ax.imshow(image, extent=extent, aspect='auto', interpolation='nearest')
+    
     # Draw only the route if provided
     if path and len(path) > 1:
         if step is None:
             step = len(path)
         path = path[:step]
-        path_edges = list(zip(path[:-1], path[1:]))
-        for i, (u, v) in enumerate(path_edges):
-            color = plt.cm.viridis(i / max(1, len(path_edges)-1))
-            nx.draw_networkx_edges(G, pos, edgelist=[(u, v)], edge_color=[color], width=4, alpha=0.9)
-        # Highlight path nodes
-        for i, node in enumerate(path):
-            if i == 0:
-                nx.draw_networkx_nodes(G, pos, nodelist=[node], node_color='#4CAF50', node_size=1000, alpha=1.0)
-            elif i == len(path) - 1:
-                nx.draw_networkx_nodes(G, pos, nodelist=[node], node_color='#F44336', node_size=1000, alpha=1.0)
-            else:
-                nx.draw_networkx_nodes(G, pos, nodelist=[node], node_color='#2196F3', node_size=800, alpha=0.9)
-    # Add labels
-    labels = {node: G.nodes[node].get('name', node) for node in G.nodes()}
-    nx.draw_networkx_labels(G, pos, labels, font_size=8)
-    plt.title(title)
-    plt.axis('off')
-    return plt
+        pos = nx.get_node_attributes(G, 'pos')
+        segments = [(pos[u], pos[v]) for u, v in zip(path[:-1], path[1:])]
+        colors = plt.cm.viridis(np.arange(len(segments)) / max(1, len(segments) - 1))
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=4, alpha=0.9))
+        
+        # Highlight path nodes: start green, end red, stops blue
+        node_colors = ['#4CAF50'] + ['#2196F3'] * (len(path) - 2) + ['#F44336']
+        node_sizes = [1000] + [800] * (len(path) - 2) + [1000]
+        ax.scatter([pos[node][0] for node in path], [pos[node][1] for node in path],
+                   s=node_sizes, c=node_colors, alpha=0.9, zorder=3)
+        # Path nodes cover their labels in the base layer, so draw those again on top
+        for node in path:
+            ax.text(pos[node][0], pos[node][1], G.nodes[node].get('name', node), fontsize=8,
+                    ha='center', va='center', zorder=4)
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    ax.set_title(title)
+    ax.axis('off')
+    return fig
 
 def get_traffic_badge(traffic_level):
     """Return HTML for a traffic badge based on level"""
@@ -583,101 +827,187 @@ def get_traffic_badge(traffic_level):
 def simulate_traffic_change():
     """Simulate traffic changes over time with more realistic variations"""
     data = load_sample_data()
-    current_hour = datetime.now().hour
-    current_day = datetime.now().weekday()
     
-    # Get future predictions
-    predictions = get_future_traffic_predictions(hours_ahead=3)
+    # Get future predictions (shared by all sessions until the next hour)
+    predictions = get_cached_future_predictions(hours_ahead=3, dataset_version=get_dataset_version())
     
-    # Initialize weather impact
-    weather_system = WeatherImpact()
-    current_weather = weather_system.get_current_weather('medium')
+    # Weather comes from the shared field so neighbouring roads agree
+    weather_field, road_cells, road_zones = get_weather_field(get_dataset_version())
+    weather_system = weather_field.weather_system
+    road_conditions = weather_field.lookup(road_cells, road_zones)
     
-    # Define realistic traffic patterns based on road types and time
-    traffic_patterns = {
-        'highway': {
-            'peak_hours': (0.6, 0.9),    # 7-9 AM and 5-7 PM
-            'off_peak': (0.3, 0.6),      # Other hours
-            'weekend': (0.4, 0.7)         # Weekend traffic
-        },
-        'hill': {
-            'peak_hours': (0.4, 0.7),
-            'off_peak': (0.2, 0.4),
-            'weekend': (0.3, 0.6)
-        },
-        'mountain': {
-            'peak_hours': (0.3, 0.6),
-            'off_peak': (0.1, 0.3),
-            'weekend': (0.2, 0.5)
-        }
-    }
+    # Headline weather is the most common condition across the network
+    condition_names = weather_system.condition_names
+    current_weather = weather_system.describe_condition(
+        condition_names[np.bincount(road_conditions, minlength=len(condition_names)).argmax()],
+        weather_system.get_current_season()
+    )
     
-    # Add random variations to traffic
-    def get_traffic_variation(base_traffic, road_type, hour, is_weekend):
-        pattern = traffic_patterns.get(road_type, traffic_patterns['highway'])
-        
-        # Determine if current hour is peak hour
-        is_peak = (7 <= hour <= 9) or (17 <= hour <= 19)
-        
-        # Get base range
-        if is_weekend:
-            min_traffic, max_traffic = pattern['weekend']
-        elif is_peak:
-            min_traffic, max_traffic = pattern['peak_hours']
-        else:
-            min_traffic, max_traffic = pattern['off_peak']
-        
-        # Add random variation (±10%)
-        variation = random.uniform(-0.1, 0.1)
-        traffic = base_traffic + variation
-        
-        # Ensure traffic stays within bounds
-        return min(max_traffic, max(min_traffic, traffic))
+    # Whole-network update on precompiled road arrays
+    road_arrays = get_road_arrays(get_dataset_version())
+    rng = np.random.default_rng()
+    road_traffic = simulate_step(
+        road_arrays,
+        predictions[0][1],
+        weather_system,
+        rng=rng,
+        condition_codes=road_conditions
+    )
+    conditions, lanes, speed_limits = sample_road_attributes(road_arrays, rng)
     
-    for road in data["roads"]:
-        # Get base traffic prediction
-        base_traffic = predictions[0][1]
-        
-        # Get road type and calculate traffic
-        road_type = road.get("type", "highway")
-        is_weekend = current_day >= 5  # Saturday or Sunday
-        
-        # Calculate traffic with variations
-        road_traffic = get_traffic_variation(
-            base_traffic,
-            road_type,
-            current_hour,
-            is_weekend
-        )
-        
-        # Apply weather impact
-        road["traffic"], _ = weather_system.apply_weather_impact(
-            road_traffic,
-            elevation=1500,
-            route_type=road_type
-        )
-        
-        # Ensure final traffic value is between 0 and 1
-        road["traffic"] = min(1.0, max(0.0, road["traffic"]))
-        
-        # Add road condition factor
-        road["condition"] = random.choice(["excellent", "good", "fair", "poor"])
-        
-        # Add lane information
-        road["lanes"] = random.choice([2, 3, 4]) if road_type == "highway" else 2
-        
-        # Add speed limit based on road type
-        speed_limits = {
-            "highway": (80, 100),
-            "hill": (40, 60),
-            "mountain": (30, 50)
-        }
-        road["speed_limit"] = random.randint(*speed_limits.get(road_type, (40, 60)))
+    for i, road in enumerate(data["roads"]):
+        road["traffic"] = float(road_traffic[i])
+        road["condition"] = ROAD_CONDITIONS[conditions[i]]
+        road["lanes"] = int(lanes[i])
+        road["speed_limit"] = int(speed_limits[i])
     
     return data, predictions, current_weather
 
-def create_map_visualization(G, path=None, map_type="folium"):
-    """Create an interactive map visualization"""
+# (legend label, lowest level, upper bound, colour, line width) for batched road traces
+TRAFFIC_CLASSES = [
+    ('Low traffic', 0.0, TRAFFIC_CLASS_BOUNDS[0], 'green', 2.5),
+    ('Moderate traffic', TRAFFIC_CLASS_BOUNDS[0], TRAFFIC_CLASS_BOUNDS[1], 'orange', 3.5),
+    ('Heavy traffic', TRAFFIC_CLASS_BOUNDS[1], float('inf'), 'red', 4.5)
+]
+
+def get_road_segments(G):
+    """
+    One map segment per road, with start/end [lat, lon] arrays, traffic levels and names
+    
+    The graph holds both directions of every road; they are merged into one
+    segment showing the busier direction.
+    """
+    nodes = list(G.nodes())
+    node_index = {node: i for i, node in enumerate(nodes)}
+    positions = np.array([G.nodes[node]['pos'] for node in nodes], dtype=np.float64)
+    edges = list(G.edges(data=True))
+    tails = np.array([node_index[u] for u, _, _ in edges], dtype=np.int64)
+    heads = np.array([node_index[v] for _, v, _ in edges], dtype=np.int64)
+    traffic = np.array([data['traffic'] for _, _, data in edges], dtype=np.float64)
+    
+    pair_keys = np.minimum(tails, heads) * len(nodes) + np.maximum(tails, heads)
+    order = np.lexsort((-traffic, pair_keys))
+    _, first = np.unique(pair_keys[order], return_index=True)
+    keep = order[first]
+    return {
+        'start': positions[tails[keep]],
+        'end': positions[heads[keep]],
+        'traffic': traffic[keep],
+        'names': [edges[i][2]['name'] for i in keep],
+        'attributes': [edges[i][2] for i in keep]
+    }
+
+def gap_separated(starts, ends):
+    """Interleave segment endpoints with NaN gaps (null in the figure JSON) so many lines share one trace"""
+    coordinates = np.full((len(starts), 3), np.nan)
+    coordinates[:, 0] = starts
+    coordinates[:, 1] = ends
+    return coordinates.ravel()
+
+# Folium marker colours per intersection type
+FOLIUM_NODE_COLORS = {
+    'capital': 'darkgreen',
+    'char_dham': 'red',
+    'pilgrimage': 'purple',
+    'tourist': 'blue',
+    'town': 'orange',
+    'city': 'darkpurple'
+}
+
+# Builds each clustered intersection marker in the browser from a compact data row
+NODE_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {radius: 8, color: row[6], fill: true, fillOpacity: 0.7});
+    marker.bindPopup("<div style='font-family: Arial; font-size: 14px;'><h4>" + row[2] + "</h4>"
+        + "<b>Elevation:</b> " + row[3] + "m<br><b>Type:</b> " + row[4] + "<br><b>Division:</b> " + row[5] + "</div>",
+        {maxWidth: 300});
+    return marker;
+};
+"""
+
+def get_map_detail_level(zoom):
+    """Index into DETAIL_LEVELS for a map zoom level"""
+    return max(i for i, (min_zoom, _, _) in enumerate(DETAIL_LEVELS) if zoom >= min_zoom)
+
+def build_map_layers(G):
+    """
+    Base layers for the Folium map: node rows for client-side marker clustering
+    and one road GeoJSON FeatureCollection per detail level
+    
+    Both directions of a road become one feature, styled by its traffic class.
+    """
+    segments = get_road_segments(G)
+    road_levels = []
+    for _, road_types, decimals in DETAIL_LEVELS:
+        features = []
+        for start, end, traffic, attributes in zip(segments['start'], segments['end'], segments['traffic'], segments['attributes']):
+            if road_types is not None and attributes['type'] not in road_types:
+                continue
+            _, _, _, color, width = next(level for level in TRAFFIC_CLASSES if traffic < level[2])
+            features.append({
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'LineString',
+                    'coordinates': [
+                        [round(start[1], decimals), round(start[0], decimals)],
+                        [round(end[1], decimals), round(end[0], decimals)]
+                    ]
+                },
+                'properties': {
+                    'name': attributes['name'],
+                    'type': attributes['type'],
+                    'condition': attributes['condition'],
+                    'lanes': attributes['lanes'],
+                    'distance': attributes['distance'],
+                    'traffic': round(float(traffic), 2),
+                    'color': color,
+                    'weight': width
+                }
+            })
+        road_levels.append({'type': 'FeatureCollection', 'features': features})
+    
+    nodes = [
+        [round(data['pos'][0], 5), round(data['pos'][1], 5), data['name'], data['elevation'],
+         data['type'], data['division'], FOLIUM_NODE_COLORS.get(data['type'], 'gray')]
+        for _, data in G.nodes(data=True)
+    ]
+    return {'nodes': nodes, 'roads': road_levels}
+
+@st.cache_data
+def get_map_layers(dataset_version):
+    """Folium base layers, built once per dataset version"""
+    return build_map_layers(create_graph_from_data(load_sample_data()))
+
+def create_route_layer(G, path):
+    """Feature group with just the route, sent to the map as an overlay on route changes"""
+    route_layer = folium.FeatureGroup(name="Route")
+    if path and len(path) > 1:
+        folium.PolyLine(
+            [G.nodes[node]['pos'] for node in path],
+            weight=6,
+            color='#2196F3',
+            opacity=0.9
+        ).add_to(route_layer)
+        for node, color in ((path[0], 'green'), (path[-1], 'red')):
+            folium.CircleMarker(
+                location=G.nodes[node]['pos'],
+                radius=10,
+                color=color,
+                fill=True,
+                fillOpacity=0.9,
+                tooltip=G.nodes[node]['name']
+            ).add_to(route_layer)
+    return route_layer
+
+def create_map_visualization(G, path=None, map_type="folium", map_layers=None, zoom=8):
+    """
+    Create an interactive map visualization
+    
+    For Folium, pass map_layers (e.g. from get_map_layers) to reuse cached base
+    layers; zoom picks how many minor roads are drawn. The map starts at the
+    detail level's lowest zoom, so every zoom within a level renders the same
+    map and st_folium's zoom/center arguments carry the live view.
+    """
     # Calculate center point
     lats = [data['pos'][0] for node, data in G.nodes(data=True)]
     lons = [data['pos'][1] for node, data in G.nodes(data=True)]
@@ -685,98 +1015,76 @@ def create_map_visualization(G, path=None, map_type="folium"):
     center_lon = sum(lons) / len(lons)
     
     if map_type == "folium":
+        layers = map_layers if map_layers is not None else build_map_layers(G)
+        detail_level = get_map_detail_level(zoom)
+        
         # Create a map centered on Uttarakhand
         m = folium.Map(location=[center_lat, center_lon], 
-                      zoom_start=8,
+                      zoom_start=DETAIL_LEVELS[detail_level][0],
                       tiles='cartodbpositron')
         
-        # Add nodes (cities)
-        for node, data in G.nodes(data=True):
-            color = {
-                'capital': 'darkgreen',
-                'char_dham': 'red',
-                'pilgrimage': 'purple',
-                'tourist': 'blue',
-                'town': 'orange',
-                'city': 'darkpurple'
-            }.get(data['type'], 'gray')
-            
-            popup_html = f"""
-            <div style='font-family: Arial; font-size: 14px;'>
-                <h4>{data['name']}</h4>
-                <b>Elevation:</b> {data['elevation']}m<br>
-                <b>Type:</b> {data['type']}<br>
-                <b>Division:</b> {data['division']}
-            </div>
-            """
-            
-            folium.CircleMarker(
-                location=data['pos'],
-                radius=8,
-                popup=folium.Popup(popup_html, max_width=300),
-                color=color,
-                fill=True,
-                fillOpacity=0.7
-            ).add_to(m)
+        # Add edges (roads) for this zoom level as one GeoJSON layer
+        folium.GeoJson(
+            layers['roads'][detail_level],
+            name="Roads",
+            style_function=lambda feature: {
+                'color': feature['properties']['color'],
+                'weight': feature['properties']['weight'],
+                'opacity': 0.8
+            },
+            popup=folium.GeoJsonPopup(
+                fields=['name', 'type', 'condition', 'lanes', 'distance', 'traffic'],
+                aliases=['Road', 'Type', 'Condition', 'Lanes', 'Distance (km)', 'Traffic Level'],
+                max_width=300
+            )
+        ).add_to(m)
         
-        # Add edges (roads)
-        for u, v, data in G.edges(data=True):
-            points = [G.nodes[u]['pos'], G.nodes[v]['pos']]
-            
-            # Color based on traffic
-            if data['traffic'] < 0.3:
-                color = 'green'
-            elif data['traffic'] < 0.6:
-                color = 'orange'
-            else:
-                color = 'red'
-            
-            # Road info popup
-            popup_html = f"""
-            <div style='font-family: Arial; font-size: 14px;'>
-                <h4>{data['name']}</h4>
-                <b>Type:</b> {data['type']}<br>
-                <b>Condition:</b> {data['condition']}<br>
-                <b>Lanes:</b> {data['lanes']}<br>
-                <b>Distance:</b> {data['distance']}km<br>
-                <b>Traffic Level:</b> {data['traffic']:.2f}
-            </div>
-            """
-            
-            folium.PolyLine(
-                points,
-                weight=2 + data['traffic'] * 3,
-                color=color,
-                opacity=0.8,
-                popup=folium.Popup(popup_html, max_width=300)
-            ).add_to(m)
+        # Add nodes (cities), clustered in the browser at low zoom
+        FastMarkerCluster(layers['nodes'], callback=NODE_MARKER_CALLBACK, name="Intersections").add_to(m)
+        
+        if path:
+            create_route_layer(G, path).add_to(m)
         
         return m
     
-    elif map_type == "plotly":
+    elif map_type in ("plotly", "plotly_webgl"):
+        # "plotly" draws on map tiles; "plotly_webgl" uses WebGL scatter traces on plain lon/lat axes
+        webgl = map_type == "plotly_webgl"
+        trace_class = go.Scattergl if webgl else go.Scattermapbox
+        
+        def coordinates(lats, lons):
+            return dict(x=lons, y=lats) if webgl else dict(lon=lons, lat=lats)
+        
         fig = go.Figure()
         
-        # Add edges (roads)
-        for u, v, data in G.edges(data=True):
-            start = G.nodes[u]['pos']
-            end = G.nodes[v]['pos']
-            
-            # Color based on traffic
-            if data['traffic'] < 0.3:
-                color = 'green'
-            elif data['traffic'] < 0.6:
-                color = 'orange'
-            else:
-                color = 'red'
-            
-            fig.add_trace(go.Scattermapbox(
-                lon=[start[1], end[1]],
-                lat=[start[0], end[0]],
+        # Add edges (roads): one trace per traffic class, segments separated by gaps
+        segments = get_road_segments(G)
+        for label, low, high, color, width in TRAFFIC_CLASSES:
+            selected = (segments['traffic'] >= low) & (segments['traffic'] < high)
+            if not selected.any():
+                continue
+            text = np.full((selected.sum(), 3), None, dtype=object)
+            text[:, :2] = [[f"{segments['names'][i]}<br>Traffic: {segments['traffic'][i]:.2f}"] for i in np.flatnonzero(selected)]
+            fig.add_trace(trace_class(
+                **coordinates(
+                    gap_separated(segments['start'][selected, 0], segments['end'][selected, 0]),
+                    gap_separated(segments['start'][selected, 1], segments['end'][selected, 1])
+                ),
                 mode='lines',
-                line=dict(width=2 + data['traffic'] * 3, color=color),
+                line=dict(width=width, color=color),
                 hoverinfo='text',
-                text=f"{data['name']}<br>Traffic: {data['traffic']:.2f}",
-                showlegend=False
+                text=text.ravel(),
+                name=label
+            ))
+        
+        # Add the route on top of the roads
+        if path and len(path) > 1:
+            fig.add_trace(trace_class(
+                **coordinates([G.nodes[node]['pos'][0] for node in path], [G.nodes[node]['pos'][1] for node in path]),
+                mode='lines',
+                line=dict(width=6, color='#2196F3'),
+                hoverinfo='skip',
+                name='Route'
             ))
         
         # Add nodes (cities)
@@ -790,20 +1098,12 @@ def create_map_visualization(G, path=None, map_type="folium"):
             names = [G.nodes[node]['name'] for node in node_list]
             elevations = [G.nodes[node]['elevation'] for node in node_list]
             
-            fig.add_trace(go.Scattermapbox(
-                lon=lons,
-                lat=lats,
+            fig.add_trace(trace_class(
+                **coordinates(lats, lons),
                 mode='markers',
                 marker=dict(
                     size=10,
-                    color={
-                        'capital': '#2E7D32',
-                        'char_dham': '#C62828',
-                        'pilgrimage': '#AD1457',
-                        'tourist': '#1565C0',
-                        'town': '#F57C00',
-                        'city': '#6A1B9A'
-                    }.get(node_type, '#666666')
+                    color=NODE_TYPE_COLORS.get(node_type, '#666666')
                 ),
                 text=[f"{name}<br>Elevation: {elev}m<br>Type: {node_type}" 
                       for name, elev in zip(names, elevations)],
@@ -812,15 +1112,24 @@ def create_map_visualization(G, path=None, map_type="folium"):
             ))
         
         fig.update_layout(
-            mapbox_style="carto-positron",
-            mapbox=dict(
-                center=dict(lat=center_lat, lon=center_lon),
-                zoom=7
-            ),
             title='Uttarakhand Traffic Network',
             showlegend=True,
             margin=dict(l=0, r=0, t=30, b=0)
         )
+        if webgl:
+            fig.update_layout(
+                xaxis=dict(visible=False),
+                yaxis=dict(visible=False, scaleanchor='x'),
+                plot_bgcolor='white'
+            )
+        else:
+            fig.update_layout(
+                mapbox_style="carto-positron",
+                mapbox=dict(
+                    center=dict(lat=center_lat, lon=center_lon),
+                    zoom=7
+                )
+            )
         
         return fig
 
@@ -849,59 +1158,94 @@ def create_traffic_prediction_plot(predictions):
     )
     return fig
 
-def create_network_analysis_plot(G):
-    """Create network analysis visualizations"""
-    # Calculate centrality metrics
-    degree_cent = nx.degree_centrality(G)
-    betweenness_cent = nx.betweenness_centrality(G)
-    closeness_cent = nx.closeness_centrality(G)
-    
+def create_road_forecast_heatmap(times, matrix, road_names, top_n=15, title=None):
+    """Create a heatmap of per-road predictions for the busiest roads over the horizon"""
+    busiest = np.argsort(matrix.mean(axis=1))[::-1][:top_n]
+    fig = go.Figure(data=go.Heatmap(
+        z=matrix[busiest] * 100,
+        x=[t.strftime("%a %H:%M") for t in times],
+        y=[road_names[i] for i in busiest],
+        colorscale=[[0, '#4CAF50'], [0.5, '#FF9800'], [1, '#F44336']],
+        zmin=0,
+        zmax=100,
+        colorbar=dict(title="Traffic (%)")
+    ))
+    fig.update_layout(
+        title=title or f"Road Traffic Outlook (Next {len(times)} Hours)",
+        xaxis_title="Time",
+        yaxis=dict(autorange="reversed"),
+        height=max(350, 25 * len(busiest)),
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    return fig
+
+def create_history_trend_plot(timestamps, traffic):
+    """Create a line plot of recorded network-wide traffic"""
+    times = [datetime.fromtimestamp(int(ts)) for ts in timestamps]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=times,
+        y=np.asarray(traffic, dtype=np.float32).mean(axis=1) * 100,
+        mode='lines',
+        name='Average Traffic',
+        line=dict(color='#1565C0', width=2)
+    ))
+    fig.add_trace(go.Scatter(
+        x=times,
+        y=np.asarray(traffic, dtype=np.float32).max(axis=1) * 100,
+        mode='lines',
+        name='Busiest Road',
+        line=dict(color='#F44336', width=1, dash='dot')
+    ))
+    fig.update_layout(
+        title="Recorded Network Traffic (Last 24 Hours)",
+        xaxis_title="Time",
+        yaxis_title="Traffic Level (%)",
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    return fig
+
+def create_network_analysis_plot(centrality):
+    """Create network analysis visualizations from a CentralityService result"""
     # Create a DataFrame for visualization
     metrics_df = pd.DataFrame({
-        'Node': list(G.nodes()),
-        'Degree Centrality': list(degree_cent.values()),
-        'Betweenness Centrality': list(betweenness_cent.values()),
-        'Closeness Centrality': list(closeness_cent.values())
+        'Node': centrality['nodes'],
+        'Degree Centrality': centrality['degree'],
+        'Betweenness Centrality': centrality['betweenness'],
+        # Weighted closeness is 1 / average travel cost; show it relative to the most accessible node
+        'Closeness Centrality': np.asarray(centrality['closeness']) / max(max(centrality['closeness']), 1e-12),
+        'Eccentricity': centrality['eccentricity']
     })
     
     return metrics_df
 
-def get_network_metrics(G):
-    """Calculate comprehensive network metrics for directed graphs"""
-    # Basic metrics
-    num_nodes = G.number_of_nodes()
-    num_edges = G.number_of_edges()
+def get_network_metrics(network_view, centrality):
+    """Calculate comprehensive network metrics for a directed graph view, reusing the centrality pass"""
+    # Basic metrics over the view's intersections and roads
+    num_nodes = len(network_view.active_nodes)
+    num_edges = int(network_view.edge_active.sum())
     
     # Calculate density
-    density = nx.density(G)
+    density = num_edges / (num_nodes * (num_nodes - 1)) if num_nodes > 1 else 0
     
-    # For directed graphs, use strongly connected components
-    try:
-        largest_scc = max(nx.strongly_connected_components(G), key=len)
-        subgraph = G.subgraph(largest_scc)
-        
-        if len(largest_scc) > 1:
-            avg_path_length = nx.average_shortest_path_length(subgraph)
-        else:
-            avg_path_length = 0
-    except (nx.NetworkXError, ValueError):
-        # Fallback if strongly connected components calculation fails
-        avg_path_length = 0
-        largest_scc = set()
+    # Path lengths over the largest strongly connected component come from the centrality searches
+    avg_path_length = centrality['avg_path_km']
     
     # Calculate connectivity metrics
-    try:
-        num_components = nx.number_strongly_connected_components(G)
-        connectivity = len(largest_scc) / num_nodes if num_nodes > 0 else 0
-    except nx.NetworkXError:
-        num_components = 1
-        connectivity = 1.0
+    num_components = centrality['num_components']
+    connectivity = centrality['component_size'] / num_nodes if num_nodes > 0 else 0
     
     return {
         'num_nodes': num_nodes,
         'num_edges': num_edges,
         'density': density,
         'avg_path_length': avg_path_length,
+        'avg_path_cost': centrality['avg_path_cost'],
+        'diameter_km': centrality['diameter_km'],
+        'diameter_cost': centrality['diameter_cost'],
         'connectivity': connectivity,
         'num_scc': num_components
     }
@@ -1084,47 +1428,65 @@ def main():
             
             G = create_graph_from_data(data, consider_traffic)
             
-            # Source and destination selection with better UX
+            # Source and destination selection with typeahead search
             nodes = list(data["intersections"].keys())
-            node_names = [f"{data['intersections'][node]['name']} ({node})" for node in nodes]
+            search_index = get_search_index(get_dataset_version())
             
             st.markdown("### 🎯 Select Your Route")
             
             # Enhanced source selection
-            source = st.selectbox(
+            source = node_search_box(
                 "🚀 Starting Point",
-                node_names,
-                index=0,
+                search_index,
+                key="route_source",
+                default=nodes[0],
                 help="Choose your departure location"
             )
             
             # Enhanced destination selection
-            destination = st.selectbox(
+            destination = node_search_box(
                 "🎯 Destination",
-                node_names,
-                index=len(node_names)-1,
+                search_index,
+                key="route_destination",
+                default=nodes[-1],
                 help="Choose your arrival location"
             )
             
             # Algorithm selection with enhanced tooltips
             algorithm = st.selectbox(
                 "🧮 Routing Algorithm",
-                ["Dijkstra's Algorithm", "A* Algorithm", "Bellman-Ford Algorithm"],
+                ["Dijkstra's Algorithm", "A* Algorithm", "Bellman-Ford Algorithm", "Hierarchical Routing (Divisions)", "Reliability Routing (P90)"],
                 help="Select the optimal pathfinding algorithm for your needs"
             )
+            if algorithm == "Hierarchical Routing (Divisions)":
+                boundary_share = get_division_router(get_dataset_version(), consider_traffic).boundary_share
+                if boundary_share > 0.5:
+                    st.caption(
+                        f"Exact like Dijkstra, but not faster on this network: {boundary_share:.0%} of intersections "
+                        "sit on a road between divisions, so the boundary tables prune little."
+                    )
             
             # Enhanced button with icon and loading state
-            if st.button("🧠 Calculate Optimal Route", help="Find the best route considering all factors"):
+            if st.button("🧠 Calculate Optimal Route", help="Find the best route considering all factors", disabled=not (source and destination)):
                 with st.spinner("🔄 Analyzing traffic patterns and calculating optimal route..."):
                     start_time = time.time()
                     
                     # Run selected algorithm
                     if algorithm == "Dijkstra's Algorithm":
-                        distance, path = dijkstra_algorithm(G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip())
+                        distance, path = dijkstra_algorithm(G, source, destination)
                     elif algorithm == "A* Algorithm":
-                        distance, path = astar_algorithm(G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip())
-                    else:  # Bellman-Ford
-                        distance, path = bellman_ford_algorithm(G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip())
+                        distance, path = astar_algorithm(G, source, destination)
+                    elif algorithm == "Bellman-Ford Algorithm":
+                        distance, path = bellman_ford_algorithm(G, source, destination)
+                    elif algorithm == "Hierarchical Routing (Divisions)":
+                        # Only divisions whose internal weights changed get their boundary tables rebuilt
+                        router = get_division_router(get_dataset_version(), consider_traffic)
+                        distance, path = router.route_with_weights(source, destination, router.weights_from_networkx(G))
+                    else:  # Reliability routing on sampled travel time distributions
+                        moments = get_edge_time_moments(get_dataset_version(), WeatherImpact().get_current_season())
+                        distance, path, reliable_mean, reliable_std = reliability_route(
+                            G, source, destination, moments, percentile=0.9
+                        )
                     
                     computation_time = time.time() - start_time
                     
@@ -1186,6 +1548,18 @@ def main():
                                 unsafe_allow_html=True
                             )
                         
+                        if algorithm == "Reliability Routing (P90)":
+                            st.markdown(f"""
+                            <div class="metric-card" style="border-left-color: var(--primary-purple);">
+                                <div style="font-weight: 600; color: var(--text-primary);">
+                                    🎯 On time 90% of the time: allow {distance:.0f} min
+                                </div>
+                                <div style="font-size: 0.9rem; color: var(--text-secondary); margin-top: 0.3rem;">
+                                    Typical trip {reliable_mean:.0f} ± {reliable_std:.0f} min under this season's weather and traffic
+                                </div>
+                            </div>
+                            """, unsafe_allow_html=True)
+                        
                         # Enhanced turn-by-turn directions with modern styling
                         st.markdown("### 🗺️ Turn-by-Turn Directions")
                         for i, (start, end) in enumerate(zip(path[:-1], path[1:]), 1):
@@ -1226,16 +1600,41 @@ def main():
             viz_tabs = st.tabs(["🕸️ Network Graph", "🌍 Interactive Map"])
             
             with viz_tabs[0]:
+                base_layer = get_network_base_layer(get_dataset_version())
                 if 'path' in locals() and path:
                     step = st.slider('Step through route', 2, len(path), len(path), help='Move slider to animate the route')
-                    fig = visualize_graph(G, path=path, step=step)
+                    fig = visualize_graph(G, path=path, step=step, base_layer=base_layer)
                 else:
-                    fig = visualize_graph(G)
-                st.pyplot(fig)
+                    fig = visualize_graph(G, base_layer=base_layer)
+                # The figure layout is fixed, so skip the tight-bbox pass and keep the base layer's resolution
+                st.pyplot(fig, dpi=NETWORK_DPI, bbox_inches=None)
+                plt.close(fig)
             
             with viz_tabs[1]:
-                m = create_map_visualization(G, path=path if 'path' in locals() else None, map_type="folium")
-                st_folium(m, width=800)
+                map_renderer = st.radio("Map renderer", ["Folium", "Plotly (tiles)", "Plotly (WebGL)"], horizontal=True)
+                if map_renderer == "Folium":
+                    # The cached base map is only re-sent when the detail level changes; route changes go as an overlay
+                    map_zoom = st.session_state.get("map_zoom", 8)
+                    m = create_map_visualization(G, map_type="folium", map_layers=get_map_layers(get_dataset_version()), zoom=map_zoom)
+                    map_state = st_folium(
+                        m,
+                        key="network_map",
+                        width=800,
+                        zoom=map_zoom,
+                        center=st.session_state.get("map_center"),
+                        feature_group_to_add=create_route_layer(G, path if 'path' in locals() else None),
+                        returned_objects=["zoom", "center"]
+                    )
+                    if map_state and map_state.get("zoom") and map_state.get("center"):
+                        st.session_state["map_center"] = (map_state["center"]["lat"], map_state["center"]["lng"])
+                        st.session_state["map_zoom"] = map_state["zoom"]
+                        if get_map_detail_level(map_state["zoom"]) != get_map_detail_level(map_zoom):
+                            st.rerun()
+                else:
+                    # WebGL traces draw large networks without map tiles underneath
+                    map_type = "plotly_webgl" if map_renderer == "Plotly (WebGL)" else "plotly"
+                    fig = create_map_visualization(G, path=path if 'path' in locals() else None, map_type=map_type)
+                    st.plotly_chart(fig, use_container_width=True)
             
             st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1248,6 +1647,9 @@ def main():
         
         # Get current traffic data and predictions
         data, predictions, weather = simulate_traffic_change()
+        traffic_history = get_traffic_history(len(data["roads"]))
+        record_traffic_snapshot(traffic_history, data)
+        publish_map_traffic(data)
         
         # Enhanced layout with better proportions
         col1, col2 = st.columns([2, 1])
@@ -1283,6 +1685,44 @@ def main():
             st.markdown('<div class="modern-card">', unsafe_allow_html=True)
             st.markdown('<h3 style="color: var(--primary-purple); margin-bottom: 1.5rem;">📈 Traffic Predictions (Next 3 Hours)</h3>', unsafe_allow_html=True)
             st.plotly_chart(create_traffic_prediction_plot(predictions), use_container_width=True)
+            
+            with st.expander("🗓️ 48-Hour Outlook by Road"):
+                forecast_times, forecast_matrix = get_cached_traffic_matrix(
+                    data["roads"],
+                    data["intersections"],
+                    hours_ahead=48,
+                    dataset_version=get_dataset_version()
+                )
+                st.plotly_chart(
+                    create_road_forecast_heatmap(forecast_times, forecast_matrix, [road["name"] for road in data["roads"]]),
+                    use_container_width=True
+                )
+            
+            with st.expander("⏩ Simulated Traffic Run"):
+                sim_col1, sim_col2 = st.columns(2)
+                with sim_col1:
+                    run_length = st.selectbox("Run length", ["1 day", "1 week"], key="sim_run_length")
+                with sim_col2:
+                    tick_minutes = st.select_slider("Tick (minutes)", options=[5, 10, 15, 30], value=5, key="sim_tick")
+                sim_times, sim_matrix, sim_ticks, sim_seconds = get_simulated_outlook(
+                    get_dataset_version(),
+                    24 if run_length == "1 day" else 168,
+                    tick_minutes,
+                    datetime.now().replace(minute=0, second=0, microsecond=0)
+                )
+                st.caption(f"Simulated {sim_ticks} ticks with calendar demand, correlated weather and congestion spillover in {sim_seconds:.1f}s")
+                st.plotly_chart(
+                    create_road_forecast_heatmap(
+                        sim_times, sim_matrix, [road["name"] for road in data["roads"]],
+                        title=f"Simulated Hourly Traffic ({run_length})"
+                    ),
+                    use_container_width=True
+                )
+            
+            if traffic_history is not None and len(traffic_history) > 1:
+                with st.expander("📉 Recorded Traffic Trend"):
+                    history_times, history_traffic = traffic_history.window(start=datetime.now() - timedelta(hours=24))
+                    st.plotly_chart(create_history_trend_plot(history_times, history_traffic), use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col2:
@@ -1318,6 +1758,48 @@ def main():
                 )
             st.markdown('</div>', unsafe_allow_html=True)
         
+        with st.expander("⛰️ Seasonal Closure Risk (Monte Carlo)"):
+            weather_system = WeatherImpact()
+            seasons = list(weather_system.seasons.keys())
+            risk_season = st.selectbox(
+                "Season",
+                seasons,
+                index=seasons.index(weather_system.get_current_season()),
+                help="Probabilities from 10,000 simulated weather and traffic scenarios"
+            )
+            risk = get_closure_risk(get_dataset_version(), risk_season)
+            risk_df = pd.DataFrame({
+                "Road Name": [road["name"] for road in data["roads"]],
+                "Closure Risk": risk["closure_probability"] * 100,
+                "Congestion Risk": risk["congestion_probability"] * 100,
+                "Expected Traffic": risk["expected_traffic"] * 100
+            }).sort_values("Closure Risk", ascending=False).head(15)
+            st.dataframe(
+                risk_df,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Closure Risk": st.column_config.ProgressColumn(
+                        "Closure Risk",
+                        help="Share of scenarios where the road is effectively closed",
+                        format="%.1f%%",
+                        min_value=0,
+                        max_value=100
+                    ),
+                    "Congestion Risk": st.column_config.ProgressColumn(
+                        "Congestion Risk",
+                        help="Share of scenarios with traffic at or above 70%",
+                        format="%.1f%%",
+                        min_value=0,
+                        max_value=100
+                    ),
+                    "Expected Traffic": st.column_config.NumberColumn(
+                        "Expected Traffic",
+                        format="%.0f%%"
+                    )
+                }
+            )
+        
         # Enhanced road-specific analysis with modern design
         st.markdown('<h3 class="sub-header">🛣️ Road-Specific Analysis</h3>', unsafe_allow_html=True)
         
@@ -1472,208 +1954,332 @@ def main():
         
         # Calculate and display network metrics
         G = create_graph_from_data(data)
-        metrics_df = create_network_analysis_plot(G)
-        network_metrics = get_network_metrics(G)
         
-        # Enhanced metrics display with modern cards
-        st.markdown('<div class="modern-card">', unsafe_allow_html=True)
-        st.markdown('<h3 style="color: var(--primary-green); margin-bottom: 1.5rem;">📈 Network Performance Metrics</h3>', unsafe_allow_html=True)
+        # Slice the analysis by division, road type and elevation without copying the graph
+        filter_col1, filter_col2, filter_col3 = st.columns(3)
+        all_divisions = sorted({node.get("division", "Garhwal") for node in data["intersections"].values()})
+        all_road_types = sorted({road.get("type", "highway") for road in data["roads"]})
+        max_elevation = int(max(node.get("elevation", 1000) for node in data["intersections"].values()))
+        with filter_col1:
+            selected_divisions = st.multiselect("Divisions", all_divisions, default=all_divisions)
+        with filter_col2:
+            selected_road_types = st.multiselect("Road types", all_road_types, default=all_road_types)
+        with filter_col3:
+            elevation_band = st.slider("Elevation band (m)", 0, max_elevation, (0, max_elevation), step=100)
         
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown(
-                create_metric_card(
-                    "Average Path Length",
-                    f"{network_metrics['avg_path_length']:.2f} km",
-                    "Average distance in largest connected component",
-                    "📏"
-                ),
-                unsafe_allow_html=True
+        # Metrics use the same simulated traffic as the graph drawn beside them
+        network = with_current_weights(get_compiled_network(get_dataset_version()), G)
+        network_view = GraphView.from_filters(
+            network,
+            divisions=selected_divisions,
+            road_types=selected_road_types,
+            min_elevation=elevation_band[0],
+            max_elevation=elevation_band[1]
+        )
+        if len(network_view.active_nodes) < 2:
+            st.warning("The selected filters leave fewer than two intersections to analyse.")
+        else:
+            view_key = (
+                get_dataset_version(),
+                hash(network.edge_data['weight'].tobytes()),
+                tuple(sorted(selected_divisions)),
+                tuple(sorted(selected_road_types)),
+                elevation_band
             )
         
-        with col2:
-            st.markdown(
-                create_metric_card(
-                    "Network Density",
-                    f"{network_metrics['density']:.2%}",
-                    "How well-connected the network is",
-                    "🔗"
-                ),
-                unsafe_allow_html=True
-            )
+            centrality_service = get_centrality_service()
+            centrality, centrality_current = centrality_service.get(view_key, network_view)
+            # Exact results on networks below the sampling threshold are quick, so only large networks show the last result meanwhile
+            if (centrality is None or set(centrality['nodes']) != {network_view.nodes[i] for i in network_view.active_nodes}
+                    or network.num_nodes <= centrality_service.options['sample_threshold']):
+                with st.spinner("Computing centrality metrics..."):
+                    centrality, centrality_current = centrality_service.get(view_key, network_view, wait=True)
+            metrics_df = create_network_analysis_plot(centrality)
+            network_metrics = get_network_metrics(network_view, centrality)
         
-        with col3:
-            st.markdown(
-                create_metric_card(
-                    "Network Connectivity",
-                    f"{network_metrics['connectivity']:.1%}",
-                    f"Largest component ({network_metrics['num_scc']} components total)",
-                    "🌐"
-                ),
-                unsafe_allow_html=True
-            )
+            # Enhanced metrics display with modern cards
+            st.markdown('<div class="modern-card">', unsafe_allow_html=True)
+            st.markdown('<h3 style="color: var(--primary-green); margin-bottom: 1.5rem;">📈 Network Performance Metrics</h3>', unsafe_allow_html=True)
         
-        with col4:
-            st.markdown(
-                create_metric_card(
-                    "Total Nodes",
-                    f"{network_metrics['num_nodes']}",
-                    "Number of intersections in network",
-                    "📍"
-                ),
-                unsafe_allow_html=True
-            )
-        st.markdown('</div>', unsafe_allow_html=True)
+            col1, col2, col3, col4 = st.columns(4)
         
-        # Enhanced centrality analysis with modern design
-        st.markdown('<h3 class="sub-header">🎯 Centrality Analysis & Node Importance</h3>', unsafe_allow_html=True)
-        st.markdown('<div class="modern-card">', unsafe_allow_html=True)
-        
-        # Create enhanced tabs for different visualizations
-        analysis_tabs = st.tabs(["📊 Centrality Metrics", "🗺️ Visual Analysis", "🔍 Node Details"])
+            with col1:
+                st.markdown(
+                    create_metric_card(
+                        "Average Path Length",
+                        f"{network_metrics['avg_path_length']:.2f} km",
+                        f"Least-cost routes in largest component (longest {network_metrics['diameter_km']:.0f} km)",
+                        "📏"
+                    ),
+                    unsafe_allow_html=True
+                )
         
-        with analysis_tabs[0]:
-            st.markdown('<h4 style="color: var(--primary-blue); margin-bottom: 1.5rem;">📊 Node Centrality Rankings</h4>', unsafe_allow_html=True)
-            
-            # Enhanced dataframe with better styling
-            st.dataframe(
-                metrics_df,
-                hide_index=True,
-                use_container_width=True,
-                column_config={
-                    "Node": st.column_config.TextColumn(
-                        "Intersection",
-                        help="Name of the intersection",
-                        width="medium"
+            with col2:
+                st.markdown(
+                    create_metric_card(
+                        "Network Density",
+                        f"{network_metrics['density']:.2%}",
+                        "How well-connected the network is",
+                        "🔗"
                     ),
-                    "Degree Centrality": st.column_config.ProgressColumn(
-                        "Degree Centrality",
-                        help="Measure of direct connections (0-1)",
-                        format="%.3f",
-                        min_value=0,
-                        max_value=1,
-                        width="medium"
+                    unsafe_allow_html=True
+                )
+        
+            with col3:
+                st.markdown(
+                    create_metric_card(
+                        "Network Connectivity",
+                        f"{network_metrics['connectivity']:.1%}",
+                        f"Largest component ({network_metrics['num_scc']} components total)",
+                        "🌐"
                     ),
-                    "Betweenness Centrality": st.column_config.ProgressColumn(
-                        "Betweenness Centrality",
-                        help="Measure of importance in connecting other nodes (0-1)",
-                        format="%.3f",
-                        min_value=0,
-                        max_value=1,
-                        width="medium"
+                    unsafe_allow_html=True
+                )
+        
+            with col4:
+                st.markdown(
+                    create_metric_card(
+                        "Total Nodes",
+                        f"{network_metrics['num_nodes']}",
+                        "Number of intersections in network",
+                        "📍"
                     ),
-                    "Closeness Centrality": st.column_config.ProgressColumn(
-                        "Closeness Centrality",
-                        help="Measure of how close a node is to all other nodes (0-1)",
-                        format="%.3f",
-                        min_value=0,
-                        max_value=1,
-                        width="medium"
+                    unsafe_allow_html=True
+                )
+            st.markdown('</div>', unsafe_allow_html=True)
+        
+            # Enhanced centrality analysis with modern design
+            st.markdown('<h3 class="sub-header">🎯 Centrality Analysis & Node Importance</h3>', unsafe_allow_html=True)
+            st.markdown('<div class="modern-card">', unsafe_allow_html=True)
+        
+            # Create enhanced tabs for different visualizations
+            analysis_tabs = st.tabs(["📊 Centrality Metrics", "🗺️ Visual Analysis", "🔍 Node Details"])
+        
+            with analysis_tabs[0]:
+                st.markdown('<h4 style="color: var(--primary-blue); margin-bottom: 1.5rem;">📊 Node Centrality Rankings</h4>', unsafe_allow_html=True)
+            
+                if not centrality_current:
+                    st.caption("Showing the last computed rankings while the current network is analysed in the background.")
+                if centrality['sample_size']:
+                    st.caption(
+                        f"Betweenness estimated from {centrality['sample_size']} sampled sources "
+                        f"(within ±{centrality['error_bound']:.3f} of exact with 95% confidence)."
                     )
-                }
-            )
             
-            # Add centrality explanation
-            st.markdown("""
-                <div style="margin-top: 1.5rem; padding: 1rem; background: var(--light-blue); border-radius: var(--border-radius-small);">
-                    <h5 style="color: var(--primary-blue); margin-bottom: 0.8rem;">📚 Centrality Metrics Explained</h5>
-                    <div style="font-size: 0.9rem; color: var(--text-secondary); line-height: 1.6;">
-                        <div style="margin-bottom: 0.5rem;"><strong>Degree Centrality:</strong> Measures how many direct connections a node has. Higher values indicate more connected intersections.</div>
-                        <div style="margin-bottom: 0.5rem;"><strong>Betweenness Centrality:</strong> Measures how often a node appears on shortest paths between other nodes. Higher values indicate critical routing points.</div>
-                        <div><strong>Closeness Centrality:</strong> Measures how close a node is to all other nodes in the network. Higher values indicate better accessibility.</div>
+                # Enhanced dataframe with better styling
+                st.dataframe(
+                    metrics_df,
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        "Node": st.column_config.TextColumn(
+                            "Intersection",
+                            help="Name of the intersection",
+                            width="medium"
+                        ),
+                        "Degree Centrality": st.column_config.ProgressColumn(
+                            "Degree Centrality",
+                            help="Measure of direct connections (0-1)",
+                            format="%.3f",
+                            min_value=0,
+                            max_value=1,
+                            width="medium"
+                        ),
+                        "Betweenness Centrality": st.column_config.ProgressColumn(
+                            "Betweenness Centrality",
+                            help="Measure of importance in connecting other nodes (0-1)",
+                            format="%.3f",
+                            min_value=0,
+                            max_value=1,
+                            width="medium"
+                        ),
+                        "Closeness Centrality": st.column_config.ProgressColumn(
+                            "Closeness Centrality",
+                            help="Inverse average travel cost from all other nodes, relative to the most accessible node (0-1)",
+                            format="%.3f",
+                            min_value=0,
+                            max_value=1,
+                            width="medium"
+                        ),
+                        "Eccentricity": st.column_config.NumberColumn(
+                            "Eccentricity",
+                            help="Travel cost to the node from the farthest node that can reach it",
+                            format="%.0f"
+                        )
+                    }
+                )
+            
+                # Add centrality explanation
+                st.markdown("""
+                    <div style="margin-top: 1.5rem; padding: 1rem; background: var(--light-blue); border-radius: var(--border-radius-small);">
+                        <h5 style="color: var(--primary-blue); margin-bottom: 0.8rem;">📚 Centrality Metrics Explained</h5>
+                        <div style="font-size: 0.9rem; color: var(--text-secondary); line-height: 1.6;">
+                            <div style="margin-bottom: 0.5rem;"><strong>Degree Centrality:</strong> Measures how many direct connections a node has. Higher values indicate more connected intersections.</div>
+                            <div style="margin-bottom: 0.5rem;"><strong>Betweenness Centrality:</strong> Measures how often a node appears on least-cost (distance and traffic weighted) paths between other nodes. Higher values indicate critical routing points.</div>
+                            <div><strong>Closeness Centrality:</strong> Measures how close a node is to all other nodes in travel cost. Higher values indicate better accessibility.</div>
+                        </div>
                     </div>
-                </div>
-            """, unsafe_allow_html=True)
+                """, unsafe_allow_html=True)
         
-        with analysis_tabs[1]:
-            st.markdown('<h4 style="color: var(--primary-purple); margin-bottom: 1.5rem;">🗺️ Network Structure Visualization</h4>', unsafe_allow_html=True)
+            with analysis_tabs[1]:
+                st.markdown('<h4 style="color: var(--primary-purple); margin-bottom: 1.5rem;">🗺️ Network Structure Visualization</h4>', unsafe_allow_html=True)
             
-            # Enhanced network visualization
-            fig = visualize_graph(G)
-            st.pyplot(fig)
+                # Enhanced network visualization
+                fig = visualize_graph(G, base_layer=get_network_base_layer(get_dataset_version()))
+                st.pyplot(fig, dpi=NETWORK_DPI, bbox_inches=None)
+                plt.close(fig)
             
-            # Add visualization legend
-            st.markdown("""
-                <div style="margin-top: 1rem; padding: 1rem; background: var(--light-green); border-radius: var(--border-radius-small);">
-                    <h5 style="color: var(--primary-green); margin-bottom: 0.8rem;">🎨 Visualization Legend</h5>
-                    <div style="font-size: 0.9rem; color: var(--text-secondary); line-height: 1.6;">
-                        <div style="margin-bottom: 0.3rem;">🔵 <strong>Nodes:</strong> Intersections and cities</div>
-                        <div style="margin-bottom: 0.3rem;">🔗 <strong>Edges:</strong> Roads and connections</div>
-                        <div style="margin-bottom: 0.3rem;">🎯 <strong>Node Size:</strong> Based on degree centrality</div>
-                        <div><strong>Edge Thickness:</strong> Based on traffic volume</div>
+                # Add visualization legend
+                st.markdown("""
+                    <div style="margin-top: 1rem; padding: 1rem; background: var(--light-green); border-radius: var(--border-radius-small);">
+                        <h5 style="color: var(--primary-green); margin-bottom: 0.8rem;">🎨 Visualization Legend</h5>
+                        <div style="font-size: 0.9rem; color: var(--text-secondary); line-height: 1.6;">
+                            <div style="margin-bottom: 0.3rem;">🔵 <strong>Nodes:</strong> Intersections and cities</div>
+                            <div style="margin-bottom: 0.3rem;">🔗 <strong>Edges:</strong> Roads and connections</div>
+                            <div style="margin-bottom: 0.3rem;">🎯 <strong>Node Size:</strong> Based on degree centrality</div>
+                            <div><strong>Edge Thickness:</strong> Based on traffic volume</div>
+                        </div>
                     </div>
-                </div>
-            """, unsafe_allow_html=True)
+                """, unsafe_allow_html=True)
         
-        with analysis_tabs[2]:
-            st.markdown('<h4 style="color: var(--primary-amber); margin-bottom: 1.5rem;">🔍 Detailed Node Analysis</h4>', unsafe_allow_html=True)
+            with analysis_tabs[2]:
+                st.markdown('<h4 style="color: var(--primary-amber); margin-bottom: 1.5rem;">🔍 Detailed Node Analysis</h4>', unsafe_allow_html=True)
             
-            # Node selection for detailed analysis
-            node_names = [f"{data['intersections'][node]['name']} ({node})" for node in data['intersections'].keys()]
-            selected_node = st.selectbox(
-                "Select a node for detailed analysis:",
-                node_names,
-                help="Choose an intersection to see detailed metrics"
-            )
+                # Node selection for detailed analysis
+                selected_node = node_search_box(
+                    "Select a node for detailed analysis:",
+                    get_search_index(get_dataset_version()),
+                    key="details_node",
+                    help="Choose an intersection to see detailed metrics"
+                )
             
-            if selected_node:
-                node_id = selected_node.split("(")[1].split(")")[0].strip()
-                node_data = data['intersections'][node_id]
-                
-                # Get centrality metrics for selected node
-                node_metrics = metrics_df[metrics_df['Node'] == node_data['name']].iloc[0] if len(metrics_df[metrics_df['Node'] == node_data['name']]) > 0 else None
+                if selected_node:
+                    node_id = selected_node
+                    node_data = data['intersections'][node_id]
                 
-                col1, col2 = st.columns(2)
+                    # Get centrality metrics for selected node
+                    node_metrics = metrics_df[metrics_df['Node'] == node_data['name']].iloc[0] if len(metrics_df[metrics_df['Node'] == node_data['name']]) > 0 else None
                 
-                with col1:
-                    st.markdown(f"""
-                        <div class="modern-card" style="margin-bottom: 1rem;">
-                            <h5 style="color: var(--primary-green); margin-bottom: 1rem;">📍 {node_data['name']}</h5>
-                            <div style="display: grid; gap: 0.8rem;">
-                                <div style="display: flex; justify-content: space-between;">
-                                    <span style="color: var(--text-secondary);">Coordinates:</span>
-                                    <span style="font-weight: 500;">({node_data['pos'][0]:.4f}, {node_data['pos'][1]:.4f})</span>
-                                </div>
-                                <div style="display: flex; justify-content: space-between;">
-                                    <span style="color: var(--text-secondary);">Type:</span>
-                                    <span style="font-weight: 500;">{node_data.get('type', 'Intersection')}</span>
-                                </div>
-                                <div style="display: flex; justify-content: space-between;">
-                                    <span style="color: var(--text-secondary);">Division:</span>
-                                    <span style="font-weight: 500;">{node_data.get('division', 'Uttarakhand')}</span>
-                                </div>
-                                <div style="display: flex; justify-content: space-between;">
-                                    <span style="color: var(--text-secondary);">Elevation:</span>
-                                    <span style="font-weight: 500;">{node_data.get('elevation', 'N/A')} m</span>
-                                </div>
-                            </div>
-                        </div>
-                    """, unsafe_allow_html=True)
+                    col1, col2 = st.columns(2)
                 
-                with col2:
-                    if node_metrics is not None:
+                    with col1:
                         st.markdown(f"""
-                            <div class="modern-card">
-                                <h5 style="color: var(--primary-blue); margin-bottom: 1rem;">📊 Centrality Metrics</h5>
+                            <div class="modern-card" style="margin-bottom: 1rem;">
+                                <h5 style="color: var(--primary-green); margin-bottom: 1rem;">📍 {node_data['name']}</h5>
                                 <div style="display: grid; gap: 0.8rem;">
                                     <div style="display: flex; justify-content: space-between;">
-                                        <span style="color: var(--text-secondary);">Degree:</span>
-                                        <span style="font-weight: 500;">{node_metrics['Degree Centrality']:.3f}</span>
+                                        <span style="color: var(--text-secondary);">Coordinates:</span>
+                                        <span style="font-weight: 500;">({node_data['pos'][0]:.4f}, {node_data['pos'][1]:.4f})</span>
                                     </div>
                                     <div style="display: flex; justify-content: space-between;">
-                                        <span style="color: var(--text-secondary);">Betweenness:</span>
-                                        <span style="font-weight: 500;">{node_metrics['Betweenness Centrality']:.3f}</span>
+                                        <span style="color: var(--text-secondary);">Type:</span>
+                                        <span style="font-weight: 500;">{node_data.get('type', 'Intersection')}</span>
                                     </div>
                                     <div style="display: flex; justify-content: space-between;">
-                                        <span style="color: var(--text-secondary);">Closeness:</span>
-                                        <span style="font-weight: 500;">{node_metrics['Closeness Centrality']:.3f}</span>
+                                        <span style="color: var(--text-secondary);">Division:</span>
+                                        <span style="font-weight: 500;">{node_data.get('division', 'Uttarakhand')}</span>
+                                    </div>
+                                    <div style="display: flex; justify-content: space-between;">
+                                        <span style="color: var(--text-secondary);">Elevation:</span>
+                                        <span style="font-weight: 500;">{node_data.get('elevation', 'N/A')} m</span>
                                     </div>
                                 </div>
                             </div>
                         """, unsafe_allow_html=True)
+                
+                    with col2:
+                        if node_metrics is not None:
+                            st.markdown(f"""
+                                <div class="modern-card">
+                                    <h5 style="color: var(--primary-blue); margin-bottom: 1rem;">📊 Centrality Metrics</h5>
+                                    <div style="display: grid; gap: 0.8rem;">
+                                        <div style="display: flex; justify-content: space-between;">
+                                            <span style="color: var(--text-secondary);">Degree:</span>
+                                            <span style="font-weight: 500;">{node_metrics['Degree Centrality']:.3f}</span>
+                                        </div>
+                                        <div style="display: flex; justify-content: space-between;">
+                                            <span style="color: var(--text-secondary);">Betweenness:</span>
+                                            <span style="font-weight: 500;">{node_metrics['Betweenness Centrality']:.3f}</span>
+                                        </div>
+                                        <div style="display: flex; justify-content: space-between;">
+                                            <span style="color: var(--text-secondary);">Closeness:</span>
+                                            <span style="font-weight: 500;">{node_metrics['Closeness Centrality']:.3f}</span>
+                                        </div>
+                                    </div>
+                                </div>
+                            """, unsafe_allow_html=True)
         
-        st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+        
+            # Equilibrium assignment: traffic that responds to demand and lane capacity
+            st.markdown('<h3 class="sub-header">🚦 Demand-Based Traffic Assignment</h3>', unsafe_allow_html=True)
+            st.markdown('<div class="modern-card">', unsafe_allow_html=True)
+            total_trips = st.slider(
+                "Network demand (trips per hour)",
+                min_value=5000,
+                max_value=100000,
+                value=20000,
+                step=5000,
+                help="Trips between intersections from a gravity model, assigned to user equilibrium"
+            )
+            flows, volume_capacity, fw_iterations, fw_gap = get_equilibrium_assignment(get_dataset_version(), total_trips)
+            st.caption(f"Frank-Wolfe converged in {fw_iterations} iterations (relative gap {fw_gap:.1e})")
+        
+            assignment_df = pd.DataFrame({
+                "Road": [road["name"] for road in data["roads"]],
+                "Type": [road.get("type", "highway") for road in data["roads"]],
+                "Lanes": [road.get("lanes", 2) for road in data["roads"]],
+                "Flow (veh/h)": flows.round(0),
+                "Volume / Capacity": volume_capacity
+            }).sort_values("Volume / Capacity", ascending=False).head(15)
+            st.dataframe(
+                assignment_df,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Volume / Capacity": st.column_config.ProgressColumn(
+                        "Volume / Capacity",
+                        help="Equilibrium flow relative to lane capacity (above 1 means overloaded)",
+                        format="%.2f",
+                        min_value=0,
+                        max_value=max(1.0, float(volume_capacity.max()))
+                    )
+                }
+            )
+            st.markdown('</div>', unsafe_allow_html=True)
+        
+            # Roads whose closure (e.g. a landslide) hurts the network most
+            st.markdown('<h3 class="sub-header">⛰️ Critical Roads (Closure Impact)</h3>', unsafe_allow_html=True)
+            st.markdown('<div class="modern-card">', unsafe_allow_html=True)
+            vulnerability = get_road_vulnerability(get_dataset_version())
+            critical_roads = rank_roads(vulnerability, top_n=15)
+            st.dataframe(
+                pd.DataFrame({
+                    "Road": [data["roads"][i]["name"] for i in critical_roads],
+                    "Type": [data["roads"][i].get("type", "highway") for i in critical_roads],
+                    "Disconnected Pairs": vulnerability['disconnected_pairs'][critical_roads],
+                    "Extra Travel Cost (%)": vulnerability['extra_cost'][critical_roads] / vulnerability['base_cost'] * 100,
+                    "Routes Affected From": vulnerability['affected_sources'][critical_roads]
+                }),
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Disconnected Pairs": st.column_config.NumberColumn(
+                        "Disconnected Pairs",
+                        help="Origin-destination pairs with no route left if this road is closed"
+                    ),
+                    "Extra Travel Cost (%)": st.column_config.NumberColumn(
+                        "Extra Travel Cost (%)",
+                        help="Increase in total travel cost between the pairs that stay connected",
+                        format="%.2f"
+                    ),
+                    "Routes Affected From": st.column_config.NumberColumn(
+                        "Routes Affected From",
+                        help="Number of origins whose best routes use this road"
+                    )
+                }
+            )
+            st.markdown('</div>', unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
     # About Tab with enhanced design